@@ -0,0 +1,29 @@
+import logging
+
+import redis
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from billing.models import Tariff
+
+
+logger = logging.getLogger(__name__)
+
+client = redis.Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=settings.REDIS_DB)
+
+
+def publish_tariff_change(tariff_id) -> None:
+    try:
+        client.publish(settings.TARIFF_CHANGES_CHANNEL, str(tariff_id))
+    except redis.RedisError:
+        # billing-api все равно перечитает тарифы по истечении TTL кеша
+        logger.exception('Failed to publish change of tariff %s', tariff_id)
+
+
+@receiver(post_save, sender=Tariff)
+@receiver(post_delete, sender=Tariff)
+def tariff_changed(sender, instance, **kwargs):
+    # публикуем после коммита, чтобы billing-api не перечитал старую версию
+    transaction.on_commit(lambda: publish_tariff_change(instance.id))
@@ -0,0 +1,8 @@
+import os
+
+
+REDIS_HOST = os.environ.get('REDIS_HOST', 'redis')
+REDIS_PORT = int(os.environ.get('REDIS_PORT', 6379))
+REDIS_DB = int(os.environ.get('REDIS_DB', 1))
+# канал, по которому billing-api сбрасывает кеш тарифов
+TARIFF_CHANGES_CHANNEL = os.environ.get('TARIFF_CHANGES_CHANNEL', 'billing:tariffs:changed')
@@ -13,4 +13,5 @@ include(
     'components/templates.py',
     'components/auth_password_validators.py',
     'components/auth.py',
+    'components/redis.py',
 )
@@ -3,9 +3,8 @@ from http import HTTPStatus
 from fastapi import APIRouter, Response, Request, Depends
 from starlette.requests import Request as StarletteRequest
 
-from src.models.users import User
 from src.schemas.tokens import Tokens, AccessToken
-from src.schemas.users import UserLoginForm
+from src.schemas.users import UserLoginForm, UserSnapshotSchema
 
 from src.services.auth import get_user_from_access_token, get_user_from_refresh_token
 from src.services.tokens import TokenService, get_token_service
@@ -67,7 +66,7 @@ async def login_via_google(request: StarletteRequest):
 async def refresh_access_token(
         response: Response,
         request: Request,
-        user: User = Depends(get_user_from_refresh_token),
+        user: UserSnapshotSchema = Depends(get_user_from_refresh_token),
         token_service: TokenService = Depends(get_token_service)
 ) -> AccessToken:
     """Обновление access токена"""
@@ -81,7 +80,7 @@ async def refresh_access_token(
 @limiter.limit("20/minute")
 async def logout_from_all_devices(
         request: Request,
-        user: User = Depends(get_user_from_access_token),
+        user: UserSnapshotSchema = Depends(get_user_from_access_token),
         token_service: TokenService = Depends(get_token_service)
 ) -> None:
     """Выход из аккаунта со всех устройств"""
@@ -3,7 +3,7 @@ from uuid import UUID
 
 from fastapi import APIRouter, Depends, Query, Request
 
-from src.models.users import User
+from src.schemas.users import UserSnapshotSchema
 from src.models.roles import Role
 
 from src.schemas.validators import Paginator
@@ -44,7 +44,7 @@ async def get_user_roles(
 async def create_role(
         request: Request,
         role_create_form: RoleCreateForm,
-        user: User = Depends(get_user_from_access_token),
+        user: UserSnapshotSchema = Depends(get_user_from_access_token),
         role_service: RolesService = Depends(get_role_service)
 ) -> Role:
     if user.is_admin():
@@ -57,7 +57,7 @@ async def create_role(
 async def delete_role(
         request: Request,
         role_id: UUID,
-        user: User = Depends(get_user_from_access_token),
+        user: UserSnapshotSchema = Depends(get_user_from_access_token),
         role_service: RolesService = Depends(get_role_service)
 ) -> None:
     if user.is_admin():
@@ -71,7 +71,7 @@ async def update_role(
         request: Request,
         role_id: UUID,
         role_update_form: RoleUpdateForm,
-        user: User = Depends(get_user_from_access_token),
+        user: UserSnapshotSchema = Depends(get_user_from_access_token),
         role_service: RolesService = Depends(get_role_service)
 ) -> RoleSchema:
     if user.is_admin():
@@ -84,7 +84,7 @@ async def update_role(
 async def attach_role(
         request: Request,
         role_attach_form: RoleAttachForm,
-        user: User = Depends(get_user_from_access_token),
+        user: UserSnapshotSchema = Depends(get_user_from_access_token),
         role_service: RolesService = Depends(get_role_service)
 ) -> None:
     if user.is_admin():
@@ -98,7 +98,7 @@ async def detach_role(
         request: Request,
         user_id: UUID = Query(),
         role_id: UUID = Query(),
-        user: User = Depends(get_user_from_access_token),
+        user: UserSnapshotSchema = Depends(get_user_from_access_token),
         role_service: RolesService = Depends(get_role_service)
 ) -> None:
     if user.is_admin():
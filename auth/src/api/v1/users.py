@@ -3,15 +3,17 @@ from uuid import UUID
 
 from fastapi import APIRouter, Depends, Request, Query
 
-from src.models.users import User
 from src.services.users import UserService, get_user_service
 from src.services.auth import get_user_from_access_token
 
-from src.schemas.users import UserCreateForm, ChangePasswordForm, FullUserSchema
+from src.schemas.users import (
+    UserCreateForm, ChangePasswordForm, FullUserSchema, SubscriptionBatchForm, SubscriptionBatchResultSchema,
+    UserSnapshotSchema
+)
 from src.schemas.histories import LoginHistorySchema
 from src.schemas.validators import Paginator
 from src.core.exceptions import USER_DOES_NOT_HAVE_RIGHTS, MISSING_HEADER_KEY_ERROR, NOT_VALID_HEADER_KEY_ERROR
-from src.limiter import limiter
+from src.limiter import limiter, get_service_key
 from src.core.config import settings as s
 
 
@@ -36,10 +38,10 @@ async def create_user(
 async def change_password(
         request: Request,
         change_password_form: ChangePasswordForm,
-        user: User = Depends(get_user_from_access_token),
+        user: UserSnapshotSchema = Depends(get_user_from_access_token),
         user_service: UserService = Depends(get_user_service)
 ) -> None:
-    await user_service.change_user_password(user, change_password_form)
+    await user_service.change_user_password(user.id, change_password_form)
 
 
 def is_valid_key(request: Request, key_name: str, key_value: str) -> bool:
@@ -80,6 +82,22 @@ async def unsubscribe(
     raise NOT_VALID_HEADER_KEY_ERROR
 
 
+@router.put(
+    '/subscriptions',
+    status_code=HTTPStatus.OK,
+    response_model=SubscriptionBatchResultSchema
+)
+@limiter.limit(s.service_rate_limit, key_func=get_service_key)
+async def change_subscriptions(
+        request: Request,
+        batch: SubscriptionBatchForm,
+        user_service: UserService = Depends(get_user_service)
+) -> SubscriptionBatchResultSchema:
+    if is_valid_key(request, s.subscribe_header_key, s.subscribe_header_value):
+        return await user_service.change_subscribe_statuses(batch.changes)
+    raise NOT_VALID_HEADER_KEY_ERROR
+
+
 @router.get(
     '/get_user_history',
     status_code=HTTPStatus.OK,
@@ -89,7 +107,7 @@ async def unsubscribe(
 async def get_user_history(
         request: Request,
         paginator: Paginator = Depends(Paginator),
-        user: User = Depends(get_user_from_access_token),
+        user: UserSnapshotSchema = Depends(get_user_from_access_token),
         user_service: UserService = Depends(get_user_service)
 ) -> list[LoginHistorySchema]:
     return await user_service.get_user_history(user, paginator)
@@ -100,7 +118,7 @@ async def get_user_history(
 async def delete_user(
         request: Request,
         user_id: UUID = Query(),
-        user: User = Depends(get_user_from_access_token),
+        user: UserSnapshotSchema = Depends(get_user_from_access_token),
         user_service: UserService = Depends(get_user_service)
 ) -> None:
     if user.is_admin():
@@ -116,7 +134,7 @@ async def delete_user(
 @limiter.limit("20/minute")
 async def get_user_info(
         request: Request,
-        user: User = Depends(get_user_from_access_token),
+        user: UserSnapshotSchema = Depends(get_user_from_access_token),
         user_service: UserService = Depends(get_user_service)
 ) -> FullUserSchema:
     return await user_service.get_user_info(user)
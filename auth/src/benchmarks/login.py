@@ -0,0 +1,125 @@
+"""Пропускная способность проверки пароля при входе в зависимости от числа ядер.
+
+Проверка хеша занимает почти все время входа, поэтому замеряется она сама:
+виртуальные пользователи с фиксированной конкуренцией проверяют пароль так же,
+как TokenService.login. Первая строка - проверка прямо в event loop, как было
+раньше, остальные - через пул процессов src.services.hashing с разным числом
+процессов. Параллельно тикер каждые 10 мс замеряет задержку event loop: пока
+хеш считается в loop, ее величина сопоставима со временем проверки.
+HTTP-эндпоинт входа ограничен 20 запросами в минуту с адреса и для замера
+не подходит. Запуск (в контейнере auth):
+
+    poetry run python -m src.benchmarks.login --workers 1,2,4,8 --concurrency 32 --duration 10
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from dataclasses import dataclass, field
+
+from werkzeug import security
+
+from src.core.config import settings
+from src.core.exceptions import CustomException
+from src.services import hashing
+
+
+PASSWORD = 'qwerty12345'
+TICK = 0.01
+
+
+@dataclass
+class RunStats:
+    latencies: list[float] = field(default_factory=list)
+    loop_lags: list[float] = field(default_factory=list)
+    rejected: int = 0
+
+
+def percentile(values: list[float], value: int) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, len(values) * value // 100)]
+
+
+async def check_inline(password_hash: str) -> bool:
+    result = security.check_password_hash(password_hash, PASSWORD)
+    # в сервисе между проверками loop переключается на другие запросы
+    await asyncio.sleep(0)
+    return result
+
+
+async def check_in_pool(password_hash: str) -> bool:
+    return await hashing.check_password(password_hash, PASSWORD)
+
+
+async def run_user(check, password_hash: str, deadline: float, stats: RunStats) -> None:
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        try:
+            assert await check(password_hash)
+        except CustomException:
+            stats.rejected += 1
+            # отказ из-за переполненной очереди, повторяем не сразу
+            await asyncio.sleep(TICK)
+            continue
+        stats.latencies.append((time.perf_counter() - started) * 1000)
+
+
+async def measure_loop_lag(deadline: float, stats: RunStats) -> None:
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        await asyncio.sleep(TICK)
+        stats.loop_lags.append((time.perf_counter() - started - TICK) * 1000)
+
+
+async def run(check, password_hash: str, concurrency: int, duration: float) -> tuple[RunStats, float]:
+    stats = RunStats()
+    deadline = time.monotonic() + duration
+    started = time.monotonic()
+    await asyncio.gather(
+        measure_loop_lag(deadline, stats),
+        *(run_user(check, password_hash, deadline, stats) for _ in range(concurrency))
+    )
+    return stats, time.monotonic() - started
+
+
+def report(name: str, stats: RunStats, elapsed: float) -> None:
+    if not stats.latencies:
+        print(f'{name:<10}no completed checks')
+        return
+    print(
+        f'{name:<10}{len(stats.latencies) / elapsed:>12.1f}'
+        f'{statistics.median(stats.latencies):>10.1f}ms{percentile(stats.latencies, 95):>8.1f}ms'
+        f'{percentile(stats.latencies, 99):>8.1f}ms{max(stats.loop_lags, default=0):>12.1f}ms{stats.rejected:>10}'
+    )
+
+
+async def main() -> None:
+    cores = hashing.get_workers_count()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', default=','.join(str(2 ** i) for i in range(cores.bit_length()) if 2 ** i <= cores))
+    parser.add_argument('--concurrency', type=int, default=cores * 4)
+    parser.add_argument('--duration', type=float, default=10)
+    args = parser.parse_args()
+
+    password_hash = security.generate_password_hash(PASSWORD)
+    print(
+        f'cores: {cores}, concurrency: {args.concurrency}, '
+        f'queue size: {settings.password_hashing_queue_size}, hash: {password_hash.split("$")[0]}'
+    )
+    print(f'\n{"workers":<10}{"logins/s":>12}{"p50":>12}{"p95":>10}{"p99":>10}{"max lag":>14}{"rejected":>10}')
+
+    stats, elapsed = await run(check_inline, password_hash, args.concurrency, args.duration)
+    report('inline', stats, elapsed)
+    for workers in (int(value) for value in args.workers.split(',')):
+        hashing.init_executor(workers)
+        try:
+            # процессы пула стартуют лениво, прогреваем их до замера
+            await asyncio.gather(*(check_in_pool(password_hash) for _ in range(workers)))
+            stats, elapsed = await run(check_in_pool, password_hash, args.concurrency, args.duration)
+        finally:
+            hashing.shutdown_executor()
+        report(str(workers), stats, elapsed)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
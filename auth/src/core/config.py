@@ -22,6 +22,22 @@ class Setting(BaseSettings):
     jaeger_agent_port: int
     subscribe_header_key: str
     subscribe_header_value: str
+    # отдельная полоса лимита для вызовов от других сервисов, ключ - их API-ключ
+    service_rate_limit: str = '600/minute'
+    subscription_batch_max_size: int = 5000
+    # кеш отзыва токенов: размер, время жизни записи "не выходил" и канал событий выхода
+    revocation_cache_size: int = 100000
+    revocation_cache_ttl: int = 300
+    logout_channel: str = 'auth:logout'
+    # кеш снимков пользователей с ролями и канал событий их изменения
+    user_cache_size: int = 10000
+    user_cache_ttl: int = 300
+    user_changes_channel: str = 'auth:users:changed'
+    pubsub_reconnect_delay: int = 5
+    # пул процессов для хеширования паролей: 0 - по числу доступных ядер;
+    # сверх занятых процессов в очереди ждут не больше password_hashing_queue_size запросов
+    password_hashing_workers: int = 0
+    password_hashing_queue_size: int = 64
 
 
 class AdminSettings(BaseSettings):
@@ -53,6 +53,10 @@ class ErrorMessagesUtil:
     def password_is_weak():
         return f"Password is weak."
 
+    @staticmethod
+    def password_hashing_overloaded():
+        return f"Too many password checks in progress, try again later."
+
     # Токены
 
     @staticmethod
@@ -104,6 +108,11 @@ WRONG_PASSWORD = CustomException(
     message=ErrorMessagesUtil.wrong_password()
 )
 
+PASSWORD_HASHING_OVERLOADED = CustomException(
+    status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+    message=ErrorMessagesUtil.password_hashing_overloaded()
+)
+
 REFRESH_TOKEN_IS_INVALID = CustomException(
     status_code=HTTPStatus.BAD_REQUEST,
     message=ErrorMessagesUtil.refresh_token_is_invalid()
@@ -1,5 +1,20 @@
+import secrets
+
+from fastapi import Request
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
+from src.core.config import settings
+
 
 limiter = Limiter(key_func=get_remote_address)
+
+
+def get_service_key(request: Request) -> str:
+    # вызовы сервисов не делят лимит с пользователями, пришедшими с того же адреса;
+    # с неверным ключом запрос попадает в обычный лимит по адресу, иначе
+    # каждый новый ключ давал бы новый счетчик
+    key = request.headers.get(settings.subscribe_header_key, '')
+    if key and secrets.compare_digest(key.encode(), settings.subscribe_header_value.encode()):
+        return 'service:' + settings.subscribe_header_value
+    return get_remote_address(request)
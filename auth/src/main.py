@@ -1,3 +1,6 @@
+import asyncio
+import contextlib
+
 from fastapi import FastAPI, Request, status
 from fastapi.responses import ORJSONResponse
 from slowapi import _rate_limit_exceeded_handler
@@ -13,6 +16,10 @@ from opentelemetry.exporter.jaeger.thrift import JaegerExporter
 from src.core.config import settings
 from src.core.exceptions import CustomException
 from src.services.users import create_admin
+from src.services import hashing
+from src.services.revocation import listen_logouts
+from src.services.user_cache import listen_user_changes
+from src.db import redis_db
 from src.limiter import limiter
 from src.api.v1 import users
 from src.api.v1 import auth
@@ -67,7 +74,21 @@ async def uvicorn_exception_handler(request: Request, exc: CustomException):
 
 @app.on_event("startup")
 async def startup() -> None:
+    hashing.init_executor()
     await create_admin()
+    app.state.listeners = [
+        asyncio.create_task(listen_logouts(redis_db.redis)),
+        asyncio.create_task(listen_user_changes(redis_db.redis))
+    ]
+
+
+@app.on_event("shutdown")
+async def shutdown() -> None:
+    for listener in app.state.listeners:
+        listener.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await listener
+    hashing.shutdown_executor()
 
 
 app.include_router(users.router, prefix='/api/v1/users', tags=['users'])
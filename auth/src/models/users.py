@@ -6,7 +6,6 @@ from datetime import datetime
 from sqlalchemy import Column, DateTime, String, Table, ForeignKey, Boolean
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
-from werkzeug.security import check_password_hash, generate_password_hash
 
 from src.db.postgres import Base
 from src.models.roles import Role
@@ -38,14 +37,12 @@ class User(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
     def __init__(self, login: str, password: str, first_name: str, last_name: str) -> None:
+        # password - уже посчитанный хеш, см. src.services.hashing
         self.login = login
-        self.password = generate_password_hash(password)
+        self.password = password
         self.first_name = first_name
         self.last_name = last_name
 
-    def check_password(self, password: str) -> bool:
-        return check_password_hash(self.password, password)
-
     @staticmethod
     def generate_strong_password(password_length):
         characters = string.ascii_letters + string.digits + string.punctuation
@@ -2,8 +2,9 @@ from http import HTTPStatus
 from uuid import UUID
 from datetime import datetime
 
-from pydantic import BaseModel, validator
+from pydantic import BaseModel, Field, validator
 
+from src.core.config import settings, admin_settings
 from src.core.exceptions import CustomException, ErrorMessagesUtil
 
 
@@ -36,10 +37,37 @@ class ChangePasswordForm(BaseModel):
 class FullUserSchema(BaseModel):
     id: UUID
     login: str
-    password: str
     first_name: str
     last_name: str
     created_at: datetime
     is_admin: bool
     subscription: str | None
 
+
+class UserSnapshotSchema(BaseModel):
+    """Данные пользователя для аутентифицированных запросов, хранятся в кеше."""
+    id: UUID
+    login: str
+    first_name: str | None
+    last_name: str | None
+    roles: list[str]
+    subscription: str | None
+    created_at: datetime
+
+    def is_admin(self) -> bool:
+        return admin_settings.ADMIN_ROLE_NAME in self.roles
+
+
+class SubscriptionChangeSchema(BaseModel):
+    user_id: UUID
+    # None - подписка отменена
+    tariff_id: UUID | None = None
+
+
+class SubscriptionBatchForm(BaseModel):
+    changes: list[SubscriptionChangeSchema] = Field(min_length=1, max_length=settings.subscription_batch_max_size)
+
+
+class SubscriptionBatchResultSchema(BaseModel):
+    updated: int
+    missing: list[UUID]
@@ -14,8 +14,10 @@ from src.core.exceptions import OAUTH_ERROR
 from src.core.exceptions import USER_NOT_AUTHORIZED, USER_NOT_FOUND, ACCESS_TOKEN_IS_INVALID, REFRESH_TOKEN_IS_INVALID
 from src.db.postgres import get_session
 from src.db.redis_db import get_redis
-from src.models.users import User
+from src.schemas.users import UserSnapshotSchema
 from src.services.common import BaseService
+from src.services.revocation import revocation_cache
+from src.services.user_cache import UserCacheService
 
 
 class AuthService(BaseService):
@@ -32,18 +34,18 @@ class AuthService(BaseService):
             raise USER_NOT_FOUND
         return user_id
 
-    async def is_token_created_before_logout(self, user: User) -> bool:
-        logout_time = await self.redis.get(str(user.id))
-        if logout_time:
+    async def is_token_created_before_logout(self, user: UserSnapshotSchema) -> bool:
+        logout_time = await revocation_cache.get_logout_time(self.redis, str(user.id))
+        if logout_time is not None:
             token = await self.authorize.get_raw_jwt()
             created_at = token['iat']
-            if created_at <= float(logout_time.decode()):
+            if created_at <= logout_time:
                 return True
         return False
 
-    async def get_user_from_token(self, token_required_func, token_exception) -> User:
+    async def get_user_from_token(self, token_required_func, token_exception) -> UserSnapshotSchema:
         user_id = await self.get_user_id_from_token(token_required_func)
-        user: User = await self.get_user_by_id(user_id)
+        user = await UserCacheService(self.db, self.redis).get(user_id)
 
         if await self.is_token_created_before_logout(user):
             await self.authorize.unset_jwt_cookies()
@@ -51,14 +53,14 @@ class AuthService(BaseService):
 
         return user
 
-    async def get_user_from_access(self):
+    async def get_user_from_access(self) -> UserSnapshotSchema:
         token_required_func = self.authorize.jwt_required
         token_exception = ACCESS_TOKEN_IS_INVALID
         return await self.get_user_from_token(
             token_required_func, token_exception
         )
 
-    async def get_user_from_refresh(self):
+    async def get_user_from_refresh(self) -> UserSnapshotSchema:
         token_required_func = self.authorize.jwt_refresh_token_required
         token_exception = REFRESH_TOKEN_IS_INVALID
         return await self.get_user_from_token(
@@ -70,7 +72,7 @@ async def get_user_from_access_token(
         db: AsyncSession = Depends(get_session),
         redis: Redis = Depends(get_redis),
         authorize: AuthJWT = Depends()
-) -> User:
+) -> UserSnapshotSchema:
     return await AuthService(db, redis, authorize).get_user_from_access()
 
 
@@ -78,7 +80,7 @@ async def get_user_from_refresh_token(
         db: AsyncSession = Depends(get_session),
         redis: Redis = Depends(get_redis),
         authorize: AuthJWT = Depends()
-) -> User:
+) -> UserSnapshotSchema:
     return await AuthService(db, redis, authorize).get_user_from_refresh()
 
 
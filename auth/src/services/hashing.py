@@ -0,0 +1,62 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from werkzeug import security
+
+from src.core.config import settings
+from src.core.exceptions import PASSWORD_HASHING_OVERLOADED
+
+
+# хеширование пароля занимает процессор на десятки и сотни миллисекунд;
+# оно выполняется в отдельных процессах, чтобы не останавливать event loop
+executor: ProcessPoolExecutor | None = None
+# ограничивает число запросов к пулу: выполняемые и ожидающие в очереди
+slots: asyncio.Semaphore | None = None
+
+
+def get_workers_count() -> int:
+    if settings.password_hashing_workers:
+        return settings.password_hashing_workers
+    # учитывает ограничение ядер для контейнера
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def init_executor(workers: int | None = None) -> None:
+    global executor, slots
+    workers = workers or get_workers_count()
+    # spawn: fork процесса с потоками (экспорт трейсов) может зависнуть
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+    slots = asyncio.Semaphore(workers + settings.password_hashing_queue_size)
+
+
+def shutdown_executor() -> None:
+    global executor, slots
+    if executor is not None:
+        executor.shutdown(wait=True)
+    executor = None
+    slots = None
+
+
+async def run(func, *args):
+    loop = asyncio.get_running_loop()
+    if slots is None:
+        # пул не запущен, например в тестах без событий старта
+        return await loop.run_in_executor(None, partial(func, *args))
+    if slots.locked():
+        # очередь заполнена: отказ сразу лучше, чем ожидание до таймаута клиента
+        raise PASSWORD_HASHING_OVERLOADED
+    async with slots:
+        return await loop.run_in_executor(executor, partial(func, *args))
+
+
+async def generate_password_hash(password: str) -> str:
+    return await run(security.generate_password_hash, password)
+
+
+async def check_password(password_hash: str, password: str) -> bool:
+    return await run(security.check_password_hash, password_hash, password)
@@ -0,0 +1,95 @@
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.core.config import settings
+
+
+class RevocationCache:
+    """Время выхода пользователей со всех устройств, закешированное в процессе.
+
+    Заполняется лениво из Redis; то, что пользователь не выходил, тоже
+    кешируется. Актуальность поддерживается событиями из канала
+    settings.logout_channel, которые публикует TokenService.logout. Пока
+    подписка не активна, события могли быть пропущены, поэтому кеш не
+    используется и каждая проверка идет в Redis.
+    """
+
+    def __init__(self, size: int, negative_ttl: int):
+        self.size = size
+        self.negative_ttl = negative_ttl
+        # user_id -> (время выхода или None, monotonic-время устаревания)
+        self.entries: OrderedDict[str, tuple[float | None, float]] = OrderedDict()
+        self.active = False
+        # меняется при сбросе, чтобы не сохранить значение, прочитанное до него
+        self.epoch = 0
+
+    def reset(self, active: bool) -> None:
+        self.entries.clear()
+        self.active = active
+        self.epoch += 1
+
+    def get(self, user_id: str) -> tuple[float | None, float] | None:
+        entry = self.entries.get(user_id)
+        if entry is None or entry[1] <= time.monotonic():
+            return None
+        self.entries.move_to_end(user_id)
+        return entry
+
+    def put(self, user_id: str, logout_time: float | None) -> None:
+        # запись о выходе живет столько же, сколько ключ в Redis
+        ttl = self.negative_ttl if logout_time is None else settings.ACCESS_TOKEN_EXPIRE
+        self.entries[user_id] = (logout_time, time.monotonic() + ttl)
+        self.entries.move_to_end(user_id)
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    async def get_logout_time(self, redis: Redis, user_id: str) -> float | None:
+        if self.active:
+            entry = self.get(user_id)
+            if entry is not None:
+                return entry[0]
+
+        epoch = self.epoch
+        value = await redis.get(user_id)
+        logout_time = float(value.decode()) if value else None
+        # пока шел запрос, могло прийти событие о выходе, оно приоритетнее
+        if self.active and self.epoch == epoch and self.get(user_id) is None:
+            self.put(user_id, logout_time)
+        return logout_time
+
+    def on_logout(self, user_id: str, logout_time: float) -> None:
+        if self.active:
+            self.put(user_id, logout_time)
+
+
+revocation_cache = RevocationCache(settings.revocation_cache_size, settings.revocation_cache_ttl)
+
+
+def get_logout_message(user_id: str, logout_time: float) -> str:
+    return json.dumps({"user_id": user_id, "logout_time": logout_time})
+
+
+async def listen_logouts(redis: Redis) -> None:
+    """Обновляет кеш отзыва токенов по событиям выхода, запускается при старте приложения."""
+    try:
+        while True:
+            try:
+                async with redis.pubsub() as pubsub:
+                    await pubsub.subscribe(settings.logout_channel)
+                    revocation_cache.reset(active=True)
+                    async for message in pubsub.listen():
+                        if message['type'] == 'message':
+                            event = json.loads(message['data'])
+                            revocation_cache.on_logout(event['user_id'], event['logout_time'])
+            except RedisError:
+                logging.exception('Logout events subscription failed, reconnecting')
+                revocation_cache.reset(active=False)
+                await asyncio.sleep(settings.pubsub_reconnect_delay)
+    finally:
+        revocation_cache.reset(active=False)
@@ -7,14 +7,17 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.engine.result import Result
 from fastapi.encoders import jsonable_encoder
 from sqlalchemy.exc import IntegrityError
+from redis.asyncio.client import Redis
 
 from src.db.postgres import get_session
+from src.db.redis_db import get_redis
 from src.core.exceptions import ROLE_NOT_FOUND, USER_DOES_NOT_HAVE_ROLE, ROLE_ALREADY_EXIST
 from src.models.roles import Role
 from src.models.users import User
 from src.schemas.roles import RoleCreateForm, RoleAttachForm, RoleUpdateForm
 from src.schemas.validators import Paginator
 from src.services.common import BaseService
+from src.services.user_cache import UserCacheService
 
 
 class RolesService(BaseService):
@@ -54,12 +57,14 @@ class RolesService(BaseService):
         role = await self.get_role_by_id(role_attach_form.role_id)
         user.roles.append(role)
         await self.db.commit()
+        await UserCacheService(self.db, self.redis).invalidate([user.id])
 
     async def detach_role(self, role_attach_form: RoleAttachForm) -> None:
         user = await self.get_user_by_id(role_attach_form.user_id)
         role = await self.get_role_by_id(role_attach_form.role_id)
         self.remove_role_from_user(user, role)
         await self.db.commit()
+        await UserCacheService(self.db, self.redis).invalidate([user.id])
 
     @staticmethod
     def remove_role_from_user(user: User, role: Role) -> None:
@@ -72,10 +77,12 @@ class RolesService(BaseService):
         role = await self.get_role_by_id(role_id)
         await self.db.delete(role)
         await self.db.commit()
+        await UserCacheService(self.db, self.redis).invalidate_all()
 
     async def update_role(self, role_id: UUID, role_update_form: RoleUpdateForm) -> Role:
         role = await self.get_role_by_id(role_id)
         await self.update_role_data(role, role_update_form)
+        await UserCacheService(self.db, self.redis).invalidate_all()
         return role
 
     async def get_role_by_id(self, role_id: UUID) -> Role:
@@ -94,6 +101,7 @@ class RolesService(BaseService):
 
 @lru_cache()
 def get_role_service(
-        db: AsyncSession = Depends(get_session)
+        db: AsyncSession = Depends(get_session),
+        redis: Redis = Depends(get_redis)
 ) -> RolesService:
-    return RolesService(db)
+    return RolesService(db, redis)
@@ -15,11 +15,14 @@ from src.models.users import User
 from src.models.history import LoginHistory
 from src.models.tokens import RefreshTokens
 from src.schemas.tokens import Tokens, AccessToken
+from src.schemas.users import UserSnapshotSchema
 from src.db.postgres import get_session
 from src.db.redis_db import get_redis
 from src.core.exceptions import WRONG_PASSWORD, REFRESH_TOKEN_IS_INVALID, USER_NOT_FOUND, USER_NOT_AUTHORIZED
 from src.core.config import settings, auth_jwt_settings, oauth
 from src.services.common import BaseService
+from src.services import hashing
+from src.services.revocation import revocation_cache, get_logout_message
 
 
 class TokenService(BaseService):
@@ -35,7 +38,7 @@ class TokenService(BaseService):
             self, login: str, password: str, request: Request, response: Response
     ) -> Tokens:
         user = await self.get_user_by_login(login)
-        if not user.check_password(password):
+        if not await hashing.check_password(user.password, password):
             raise WRONG_PASSWORD
 
         tokens = await self.create_tokens(user.id)
@@ -45,7 +48,7 @@ class TokenService(BaseService):
 
         return tokens
 
-    async def refresh(self, user: User, request: Request, response: Response):
+    async def refresh(self, user: UserSnapshotSchema, request: Request, response: Response):
         refresh_token_cookie = request.cookies[auth_jwt_settings.authjwt_refresh_cookie_key]
 
         if await self.is_refresh_token_exist(user.id, refresh_token_cookie):
@@ -123,10 +126,12 @@ class TokenService(BaseService):
 
     async def logout(self, user_id: UUID) -> None:
         await self.delete_refresh_token_by_user_id(user_id)
-        await self.redis.set(
-            str(user_id),
-            str(datetime.utcnow().timestamp()),
-            settings.ACCESS_TOKEN_EXPIRE)
+        logout_time = datetime.utcnow().timestamp()
+        async with self.redis.pipeline() as pipe:
+            pipe.set(str(user_id), str(logout_time), settings.ACCESS_TOKEN_EXPIRE)
+            pipe.publish(settings.logout_channel, get_logout_message(str(user_id), logout_time))
+            await pipe.execute()
+        revocation_cache.on_logout(str(user_id), logout_time)
         await self.authorize.unset_jwt_cookies()
 
 
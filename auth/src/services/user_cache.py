@@ -0,0 +1,163 @@
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from uuid import UUID
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.core.config import settings
+from src.models.users import User
+from src.schemas.users import UserSnapshotSchema
+from src.services.common import BaseService
+
+
+USER_SNAPSHOT_KEY = 'auth:user:{user_id}'
+USER_VERSION_KEY = 'auth:user:{user_id}:version'
+# общая версия, меняется при изменении и удалении ролей
+USERS_VERSION_KEY = 'auth:users:version'
+
+
+class UserCache:
+    """Снимки пользователей, закешированные в процессе.
+
+    Записи удаляются по событиям из канала settings.user_changes_channel.
+    Пока подписка не активна, кеш не используется и снимок читается из Redis.
+    """
+
+    def __init__(self, size: int, ttl: int):
+        self.size = size
+        self.ttl = ttl
+        self.entries: OrderedDict[str, tuple[UserSnapshotSchema, float]] = OrderedDict()
+        self.active = False
+        # меняется при каждом событии, чтобы не сохранить снимок, загруженный до него
+        self.epoch = 0
+
+    def reset(self, active: bool) -> None:
+        self.entries.clear()
+        self.active = active
+        self.epoch += 1
+
+    def get(self, user_id: str) -> UserSnapshotSchema | None:
+        if not self.active:
+            return None
+        entry = self.entries.get(user_id)
+        if entry is None or entry[1] <= time.monotonic():
+            return None
+        self.entries.move_to_end(user_id)
+        return entry[0]
+
+    def put(self, user_id: str, snapshot: UserSnapshotSchema, epoch: int) -> None:
+        if not self.active or self.epoch != epoch:
+            return
+        self.entries[user_id] = (snapshot, time.monotonic() + self.ttl)
+        self.entries.move_to_end(user_id)
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def evict(self, user_ids: list[str]) -> None:
+        self.epoch += 1
+        for user_id in user_ids:
+            self.entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        self.reset(self.active)
+
+
+user_cache = UserCache(settings.user_cache_size, settings.user_cache_ttl)
+
+
+def to_snapshot(user: User) -> UserSnapshotSchema:
+    return UserSnapshotSchema(
+        id=user.id,
+        login=user.login,
+        first_name=user.first_name,
+        last_name=user.last_name,
+        roles=[role.name for role in user.roles],
+        subscription=user.subscription,
+        created_at=user.created_at
+    )
+
+
+class UserCacheService(BaseService):
+    """Версионированный кеш снимков пользователей: LRU в процессе и Redis.
+
+    Снимок в Redis хранит версии пользователя и ролей, с которыми он был
+    загружен, и считается устаревшим, если хотя бы одна из них изменилась.
+    Поэтому снимок, загруженный из базы до изменения и записанный после
+    него, не будет прочитан.
+    """
+
+    async def get(self, user_id: UUID) -> UserSnapshotSchema:
+        key = str(user_id)
+        snapshot = user_cache.get(key)
+        if snapshot is not None:
+            return snapshot
+
+        epoch = user_cache.epoch
+        value, user_version, users_version = await self.redis.mget(
+            USER_SNAPSHOT_KEY.format(user_id=key),
+            USER_VERSION_KEY.format(user_id=key),
+            USERS_VERSION_KEY
+        )
+        version = [int(user_version or 0), int(users_version or 0)]
+        if value:
+            record = json.loads(value)
+            if record['version'] == version:
+                snapshot = UserSnapshotSchema.model_validate(record['user'])
+                user_cache.put(key, snapshot, epoch)
+                return snapshot
+
+        snapshot = to_snapshot(await self.get_user_by_id(user_id))
+        record = {'version': version, 'user': snapshot.model_dump(mode='json')}
+        await self.redis.set(USER_SNAPSHOT_KEY.format(user_id=key), json.dumps(record), ex=settings.user_cache_ttl)
+        user_cache.put(key, snapshot, epoch)
+        return snapshot
+
+    async def invalidate(self, user_ids: list[UUID]) -> None:
+        """Сбрасывает снимки пользователей, вызывается после коммита изменений."""
+        keys = [str(user_id) for user_id in user_ids]
+        async with self.redis.pipeline() as pipe:
+            for key in keys:
+                version_key = USER_VERSION_KEY.format(user_id=key)
+                pipe.incr(version_key)
+                # версия живет дольше снимка, иначе старый снимок снова станет актуальным
+                pipe.expire(version_key, settings.user_cache_ttl * 2)
+                pipe.delete(USER_SNAPSHOT_KEY.format(user_id=key))
+            pipe.publish(settings.user_changes_channel, json.dumps({'user_ids': keys}))
+            await pipe.execute()
+        user_cache.evict(keys)
+
+    async def invalidate_all(self) -> None:
+        """Сбрасывает снимки всех пользователей, например после переименования роли."""
+        async with self.redis.pipeline() as pipe:
+            pipe.incr(USERS_VERSION_KEY)
+            pipe.publish(settings.user_changes_channel, json.dumps({'user_ids': None}))
+            await pipe.execute()
+        user_cache.clear()
+
+
+async def listen_user_changes(redis: Redis) -> None:
+    """Удаляет снимки из кеша процесса по событиям изменений, запускается при старте приложения."""
+    try:
+        while True:
+            try:
+                async with redis.pubsub() as pubsub:
+                    await pubsub.subscribe(settings.user_changes_channel)
+                    user_cache.reset(active=True)
+                    async for message in pubsub.listen():
+                        if message['type'] != 'message':
+                            continue
+                        user_ids = json.loads(message['data'])['user_ids']
+                        if user_ids is None:
+                            user_cache.clear()
+                        else:
+                            user_cache.evict(user_ids)
+            except RedisError:
+                logging.exception('User changes subscription failed, reconnecting')
+                user_cache.reset(active=False)
+                await asyncio.sleep(settings.pubsub_reconnect_delay)
+    finally:
+        user_cache.reset(active=False)
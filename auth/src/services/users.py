@@ -3,13 +3,17 @@ from uuid import UUID
 
 from fastapi import Depends
 from fastapi.encoders import jsonable_encoder
-from sqlalchemy import select
+from sqlalchemy import select, update, values, column, cast, String
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.engine.result import Result
 from sqlalchemy.exc import IntegrityError
-from werkzeug.security import generate_password_hash
+from redis.asyncio.client import Redis
 
-from src.schemas.users import UserCreateForm, ChangePasswordForm, FullUserSchema
+from src.schemas.users import (
+    UserCreateForm, ChangePasswordForm, FullUserSchema, SubscriptionChangeSchema, SubscriptionBatchResultSchema,
+    UserSnapshotSchema
+)
 from src.schemas.histories import LoginHistorySchema
 from src.schemas.validators import Paginator
 
@@ -20,7 +24,10 @@ from src.models.history import LoginHistory
 from src.core.exceptions import USER_ALREADY_EXIST, WRONG_PASSWORD
 from src.core.config import admin_settings
 from src.db.postgres import get_session, async_session
+from src.db.redis_db import get_redis
 from src.services.common import BaseService
+from src.services import hashing
+from src.services.user_cache import UserCacheService
 
 
 async def create_admin():
@@ -28,7 +35,7 @@ async def create_admin():
         db = async_session()
         admin = User(
             login=admin_settings.ADMIN_LOGIN,
-            password=admin_settings.ADMIN_PASSWORD,
+            password=await hashing.generate_password_hash(admin_settings.ADMIN_PASSWORD),
             first_name=admin_settings.ADMIN_FIRST_NAME,
             last_name=admin_settings.ADMIN_LAST_NAME
         )
@@ -47,6 +54,7 @@ class UserService(BaseService):
         try:
             # DTO - data transfer object
             user_dto = jsonable_encoder(user_create_form)
+            user_dto['password'] = await hashing.generate_password_hash(user_dto['password'])
             user = User(**user_dto)
             await self.update_model_object(user)
             return user
@@ -54,11 +62,12 @@ class UserService(BaseService):
             raise USER_ALREADY_EXIST
 
     async def change_user_password(
-            self, user: User, change_password_form: ChangePasswordForm
+            self, user_id: UUID, change_password_form: ChangePasswordForm
     ) -> None:
-        if not user.check_password(change_password_form.previous_password):
+        user = await self.get_user_by_id(user_id)
+        if not await hashing.check_password(user.password, change_password_form.previous_password):
             raise WRONG_PASSWORD
-        user.password = generate_password_hash(change_password_form.new_password)
+        user.password = await hashing.generate_password_hash(change_password_form.new_password)
         await self.update_model_object(user)
 
     async def get_login_history_query(
@@ -78,41 +87,44 @@ class UserService(BaseService):
         login_records = [login_record for login_record in query.scalars().all()]
         return login_records
 
-    async def get_user_history(self, user: User, paginator: Paginator) -> list[LoginHistorySchema]:
+    async def get_user_history(self, user: UserSnapshotSchema, paginator: Paginator) -> list[LoginHistorySchema]:
         query = await self.get_login_history_query(user.id, paginator.page_number, paginator.page_size)
         login_records = self.get_login_records_from_query(query)
         return login_records
 
     @staticmethod
-    async def get_user_info(user: User) -> FullUserSchema:
-        # DTO - data transfer object
-        user_dto = jsonable_encoder(user)
-        user_dto['is_admin'] = user.is_admin()
-        return FullUserSchema(**user_dto)
+    async def get_user_info(user: UserSnapshotSchema) -> FullUserSchema:
+        return FullUserSchema(**user.model_dump(), is_admin=user.is_admin())
 
     async def get_or_create_user(self, user_info: dict) -> User:
-        user_data = {
-            'login': user_info['email'],
-            'password': User.generate_strong_password(16),
-            'first_name': user_info['given_name'],
-            'last_name': user_info['family_name']
-        }
-        sql_request = await self.db.execute(select(User).where(User.login == user_data['login']))
+        sql_request = await self.db.execute(select(User).where(User.login == user_info['email']))
         user: User = sql_request.scalar()
         if not user:
-            user = User(**user_data)
+            user = User(
+                login=user_info['email'],
+                password=await hashing.generate_password_hash(User.generate_strong_password(16)),
+                first_name=user_info['given_name'],
+                last_name=user_info['family_name']
+            )
             await self.update_model_object(user)
         return user
 
     async def delete_user(self, user_id: UUID) -> None:
         user = await self.get_user_by_id(user_id)
+        # роли удаляются каскадом вместе с пользователем и пропадают у всех их владельцев
+        had_roles = bool(user.roles)
         await self.db.delete(user)
         await self.db.commit()
+        user_cache_service = UserCacheService(self.db, self.redis)
+        await user_cache_service.invalidate([user_id])
+        if had_roles:
+            await user_cache_service.invalidate_all()
 
     async def change_subscribe_status(self, user_id: UUID, tariff_id: UUID | None) -> None:
         user = await self.get_user_by_id(user_id)
-        user.subscription = str(tariff_id)
+        user.subscription = str(tariff_id) if tariff_id else None
         await self.update_model_object(user)
+        await UserCacheService(self.db, self.redis).invalidate([user_id])
 
     async def subscribe(self, user_id: UUID, tariff_id: UUID) -> None:
         await self.change_subscribe_status(user_id, tariff_id)
@@ -120,9 +132,43 @@ class UserService(BaseService):
     async def unsubscribe(self, user_id: UUID):
         await self.change_subscribe_status(user_id, None)
 
+    async def change_subscribe_statuses(
+            self, changes: list[SubscriptionChangeSchema]
+    ) -> SubscriptionBatchResultSchema:
+        """Применяет пачку изменений подписок одним UPDATE ... FROM (VALUES ...).
+
+        Пользователи не загружаются в сессию; при повторе пользователя в пачке
+        побеждает последнее изменение.
+        """
+        latest = {change.user_id: change.tariff_id for change in changes}
+        rows = values(
+            column('user_id', String),
+            column('tariff_id', String),
+            name='changes'
+        ).data([
+            (str(user_id), str(tariff_id) if tariff_id else None)
+            for user_id, tariff_id in latest.items()
+        ])
+        query = await self.db.execute(
+            update(User)
+            .where(User.id == cast(rows.c.user_id, PG_UUID))
+            .values(subscription=rows.c.tariff_id)
+            .returning(User.id)
+            .execution_options(synchronize_session=False)
+        )
+        updated = set(query.scalars().all())
+        await self.db.commit()
+        if updated:
+            await UserCacheService(self.db, self.redis).invalidate(list(updated))
+        return SubscriptionBatchResultSchema(
+            updated=len(updated),
+            missing=[user_id for user_id in latest if user_id not in updated]
+        )
+
 
 @lru_cache()
 def get_user_service(
-        db: AsyncSession = Depends(get_session)
+        db: AsyncSession = Depends(get_session),
+        redis: Redis = Depends(get_redis)
 ) -> UserService:
-    return UserService(db)
+    return UserService(db, redis)
@@ -67,3 +67,24 @@ async def test_logout(test_client):
         headers={"Accept": "application/json", **cookies}
     )
     assert refresh_response.status_code == 204
+
+
+@pytest.mark.asyncio
+async def test_access_token_revoked_after_logout(test_client):
+    tokens_response = await test_client.post(
+        "/auth/login",
+        json={
+            'login': admin_settings.ADMIN_LOGIN,
+            'password': admin_settings.ADMIN_PASSWORD
+        }
+    )
+    content = json.loads(tokens_response.content.decode('utf-8'))
+    headers = {"Authorization": f"Bearer {content['access_token']}", "X-Request-Id": "test"}
+    me_response = await test_client.get("/users/me", headers=headers)
+    assert me_response.status_code == 200
+
+    logout_response = await test_client.get("/auth/logout", headers=headers)
+    assert logout_response.status_code == 204
+
+    me_response = await test_client.get("/users/me", headers=headers)
+    assert me_response.status_code == 400
@@ -59,6 +59,24 @@ async def test_login_history(test_client):
     assert 1 <= len(get_content(response.content)) <= 20
 
 
+@pytest.mark.asyncio
+async def test_user_information_after_subscription_change(test_client):
+    access_token = await get_access_token(test_client, 'qwerty123456')
+    headers = {"Accept": "application/json", "Authorization": f"Bearer {access_token}"}
+    user = get_content((await test_client.get("/users/me", headers=headers)).content)
+    assert 'password' not in user
+
+    tariff_id = '11111111-1111-1111-1111-111111111111'
+    response = await test_client.put(
+        f"/users/subscribe/{user['id']}?tariff_id={tariff_id}",
+        headers={'x-api-key': '11111'}
+    )
+    assert response.status_code == 200
+
+    user = get_content((await test_client.get("/users/me", headers=headers)).content)
+    assert user['subscription'] == tariff_id
+
+
 @pytest.mark.asyncio
 async def test_user_information(test_client, clear_data):
     access_token = await get_access_token(test_client, 'qwerty123456')
@@ -68,3 +86,24 @@ async def test_user_information(test_client, clear_data):
         headers={"Accept": "application/json", **cookies},
     )
     assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_change_subscriptions_without_key(test_client):
+    response = await test_client.put(
+        "/users/subscriptions",
+        json={'changes': [{'user_id': '00000000-0000-0000-0000-000000000000', 'tariff_id': None}]}
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_change_subscriptions_unknown_user(test_client):
+    user_id = '00000000-0000-0000-0000-000000000000'
+    response = await test_client.put(
+        "/users/subscriptions",
+        headers={'x-api-key': '11111'},
+        json={'changes': [{'user_id': user_id, 'tariff_id': None}]}
+    )
+    assert response.status_code == 200
+    assert get_content(response.content) == {'updated': 0, 'missing': [user_id]}
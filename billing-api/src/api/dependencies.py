@@ -0,0 +1,13 @@
+import secrets
+
+from fastapi import Request
+
+from core.config import settings
+from core.exceptions import ServiceKeyInvalidError
+
+
+def verify_service_key(request: Request) -> None:
+    """Пропускает только вызовы других сервисов и мониторинга с ключом API."""
+    key = request.headers.get(settings.header_key, '')
+    if not secrets.compare_digest(key, settings.service_api_key):
+        raise ServiceKeyInvalidError
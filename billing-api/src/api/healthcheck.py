@@ -1,6 +1,24 @@
-from fastapi import APIRouter, Response, status
+from fastapi import APIRouter, Depends, Response, status
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from api.dependencies import verify_service_key
+from core.config import settings
+from db import postgres
+from db.pool import pool_stats
+from db.postgres import get_async_session
+from db.redis_db import get_redis
+from schemas.jwt_cache import JWTCacheStatsSchema
+from schemas.outbox import OutboxStatsSchema
+from schemas.pool import PoolStatsSchema
+from schemas.scheduler import SchedulerStateSchema
+from services.jwt_service import claims_cache
+from services.leader import get_scheduler_state
+from services.outbox import get_outbox_stats
 
+
+# /health открыт для проверок живости, остальные эндпоинты раскрывают внутреннее
+# состояние и доступны только с ключом API сервисов
 router = APIRouter()
 
 
@@ -15,3 +33,59 @@ router = APIRouter()
 def healthcheck() -> Response:
     """Check if service healthy."""
     return Response(status_code=status.HTTP_200_OK)
+
+
+@router.get(
+    "/health/scheduler/{name}",
+    tags=["healthcheck"],
+    dependencies=[Depends(verify_service_key)],
+    summary="Состояние периодической задачи",
+    response_description="Текущий лидер и время завершения последнего запуска",
+    response_model=SchedulerStateSchema,
+    status_code=status.HTTP_200_OK,
+)
+async def scheduler_state(name: str, redis: Redis = Depends(get_redis)) -> SchedulerStateSchema:
+    """Show which node holds the lease and when the last run finished."""
+    return await get_scheduler_state(redis, name)
+
+
+@router.get(
+    "/health/db-pool",
+    tags=["healthcheck"],
+    dependencies=[Depends(verify_service_key)],
+    summary="Состояние пула соединений с Postgres",
+    response_description="Загрузка пула и время ожидания соединения в текущем воркере",
+    response_model=PoolStatsSchema,
+    status_code=status.HTTP_200_OK,
+)
+async def db_pool_stats() -> PoolStatsSchema:
+    """Show connection pool saturation and checkout wait time of this worker."""
+    return pool_stats.snapshot(postgres.engine.sync_engine.pool, settings.postgres.max_overflow)
+
+
+@router.get(
+    "/health/outbox",
+    tags=["healthcheck"],
+    dependencies=[Depends(verify_service_key)],
+    summary="Очередь уведомлений сервиса авторизации",
+    response_description="Число недоставленных изменений подписок и задержка доставки",
+    response_model=OutboxStatsSchema,
+    status_code=status.HTTP_200_OK,
+)
+async def outbox_stats(session: AsyncSession = Depends(get_async_session)) -> OutboxStatsSchema:
+    """Show how many subscription changes wait for delivery and how old the oldest one is."""
+    return await get_outbox_stats(session)
+
+
+@router.get(
+    "/health/jwt-cache",
+    tags=["healthcheck"],
+    dependencies=[Depends(verify_service_key)],
+    summary="Кеш проверенных токенов доступа",
+    response_description="Заполненность кеша и доля попаданий в текущем воркере",
+    response_model=JWTCacheStatsSchema,
+    status_code=status.HTTP_200_OK,
+)
+async def jwt_cache_stats() -> JWTCacheStatsSchema:
+    """Show size and hit ratio of the verified token cache of this worker."""
+    return claims_cache.snapshot()
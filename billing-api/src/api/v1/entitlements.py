@@ -0,0 +1,34 @@
+from http import HTTPStatus
+from uuid import UUID
+
+from fastapi import APIRouter, Depends
+
+from api.dependencies import verify_service_key
+from schemas.entitlement import EntitlementBatchSchema, EntitlementSchema
+from services.entitlement import EntitlementService, get_entitlement_service
+
+
+router = APIRouter(dependencies=[Depends(verify_service_key)])
+
+
+@router.get('/entitlements/{user_id}',
+            summary="Есть ли у пользователя активная подписка",
+            response_model=EntitlementSchema,
+            status_code=HTTPStatus.OK)
+async def get_entitlement(
+        user_id: UUID,
+        entitlement_service: EntitlementService = Depends(get_entitlement_service)
+) -> EntitlementSchema:
+    return await entitlement_service.get(user_id)
+
+
+@router.post('/entitlements',
+             summary="Активные подписки пачки пользователей",
+             response_description="Ответы в порядке переданных идентификаторов, без повторов",
+             response_model=list[EntitlementSchema],
+             status_code=HTTPStatus.OK)
+async def get_entitlements(
+        batch: EntitlementBatchSchema,
+        entitlement_service: EntitlementService = Depends(get_entitlement_service)
+) -> list[EntitlementSchema]:
+    return await entitlement_service.get_many(batch.user_ids)
@@ -0,0 +1,27 @@
+import datetime
+from http import HTTPStatus
+
+from fastapi import APIRouter, Depends
+
+from core.exceptions import UserDoesntHaveRightsError
+from schemas.renewal import RenewalBucketSchema
+from schemas.user import UserSchema
+from services.jwt_service import get_user_data_from_jwt
+from services.renewal_plan_service import RenewalPlanService, get_renewal_plan_service
+
+
+router = APIRouter()
+
+
+@router.get('/renewals/plan',
+            summary="Плановая нагрузка продлений по временным окнам",
+            response_model=list[RenewalBucketSchema],
+            status_code=HTTPStatus.OK)
+async def renewal_plan(
+        day: datetime.date | None = None,
+        admin_data: UserSchema = Depends(get_user_data_from_jwt),
+        renewal_plan_service: RenewalPlanService = Depends(get_renewal_plan_service),
+) -> list[RenewalBucketSchema]:
+    if 'admin' in admin_data.roles:
+        return await renewal_plan_service.get_plan(day or datetime.date.today())
+    raise UserDoesntHaveRightsError
@@ -1,9 +1,13 @@
 from uuid import UUID
 from http import HTTPStatus
 
-from fastapi import APIRouter, Depends, Response
+from fastapi import APIRouter, Depends, Header, Query, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
 
+from core.config import settings
 from schemas.tariff import PaymentSchema, SubscriptionSchema
+from services.idempotency import IdempotencyService, get_idempotency_service, get_provider_key
+from services.payment.history_service import PaymentHistoryService, get_payment_history_service
 from services.payment.yookassa_service import YookassaService, get_yookassa_service
 from services.jwt_service import get_user_data_from_jwt
 from schemas.payment import CreatePaymentSchema, CreatedPaymentSchema, PaymentHistorySchema
@@ -11,6 +15,14 @@ from schemas.user import UserSchema
 from core.exceptions import UserDoesntHaveRightsError
 
 
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
+IDEMPOTENCY_KEY_HEADER = Header(
+    default=None,
+    alias='Idempotency-Key',
+    max_length=128,
+    description="Повтор запроса с тем же ключом вернет сохраненный ответ"
+)
+
 router = APIRouter()
 
 
@@ -21,10 +33,21 @@ router = APIRouter()
              status_code=HTTPStatus.CREATED)
 async def subscribe(
         payment_data: CreatePaymentSchema,
+        idempotency_key: str | None = IDEMPOTENCY_KEY_HEADER,
         user_data: UserSchema = Depends(get_user_data_from_jwt),
-        payment_service: YookassaService = Depends(get_yookassa_service)
-) -> CreatedPaymentSchema:
-    return await payment_service.create_payment(user_data.user_id, payment_data.tariff_id)
+        payment_service: YookassaService = Depends(get_yookassa_service),
+        idempotency_service: IdempotencyService = Depends(get_idempotency_service)
+) -> Response:
+    async def create_payment() -> Response:
+        provider_key = get_provider_key('subscribe', user_data.user_id, idempotency_key) if idempotency_key else None
+        payment = await payment_service.create_payment(user_data.user_id, payment_data.tariff_id, provider_key)
+        return ORJSONResponse(payment.model_dump(), status_code=HTTPStatus.CREATED)
+
+    if not idempotency_key:
+        return await create_payment()
+    return await idempotency_service.run(
+        'subscribe', user_data.user_id, idempotency_key, payment_data.model_dump_json(), create_payment
+    )
 
 
 @router.post('/cancellation',
@@ -32,14 +55,26 @@ async def subscribe(
              status_code=HTTPStatus.OK)
 async def cancellation(
         user_id: UUID,
+        idempotency_key: str | None = IDEMPOTENCY_KEY_HEADER,
         admin_data: UserSchema = Depends(get_user_data_from_jwt),
         payment_service: YookassaService = Depends(get_yookassa_service),
+        idempotency_service: IdempotencyService = Depends(get_idempotency_service),
         return_fund: bool = False,
 ) -> Response:
-    if 'admin' in admin_data.roles:
-        await payment_service.unsubscribe(user_id, return_fund)
+    if 'admin' not in admin_data.roles:
+        raise UserDoesntHaveRightsError
+
+    async def cancel() -> Response:
+        provider_key = get_provider_key('cancellation', str(user_id), idempotency_key) if idempotency_key else None
+        await payment_service.unsubscribe(user_id, return_fund, provider_key)
         return Response(content='success')
-    raise UserDoesntHaveRightsError
+
+    if not idempotency_key:
+        return await cancel()
+    # ключ общий для администратора, отменяющего подписку этого пользователя
+    return await idempotency_service.run(
+        'cancellation', str(user_id), idempotency_key, f'{user_id}:{return_fund}', cancel
+    )
 
 
 @router.post('/unsubscribe',
@@ -57,13 +92,30 @@ async def unsubscribe(
 
 @router.get('/history',
             summary="История платежей",
+            description="Платежи от новых к старым. Курсор следующей страницы возвращается "
+                        "в заголовке X-Next-Cursor. С заголовком Accept: application/x-ndjson "
+                        "вся история отдается потоком, по платежу на строку.",
             response_model=list[PaymentSchema],
             status_code=HTTPStatus.OK)
 async def history(
-        user_data: UUID = Depends(get_user_data_from_jwt),
-        payment_service: YookassaService = Depends(get_yookassa_service),
-) -> list[PaymentSchema]:
-    return await payment_service.get_all_payments(user_data.user_id)
+        user_id: UUID | None = None,
+        cursor: str | None = None,
+        limit: int = Query(default=settings.history_page_size, ge=1, le=settings.history_max_page_size),
+        accept: str | None = Header(default=None),
+        user_data: UserSchema = Depends(get_user_data_from_jwt),
+        history_service: PaymentHistoryService = Depends(get_payment_history_service),
+) -> Response:
+    # историю другого пользователя выгружает только администратор
+    if user_id and str(user_id) != user_data.user_id and 'admin' not in user_data.roles:
+        raise UserDoesntHaveRightsError
+    user_id = user_id or user_data.user_id
+
+    if accept and NDJSON_MEDIA_TYPE in accept:
+        return StreamingResponse(history_service.stream(user_id), media_type=NDJSON_MEDIA_TYPE)
+
+    payments, next_cursor = await history_service.get_page(user_id, limit, cursor)
+    headers = {'X-Next-Cursor': next_cursor} if next_cursor else None
+    return ORJSONResponse([payment.model_dump(mode='json') for payment in payments], headers=headers)
 
 
 @router.get('/subscriptions',
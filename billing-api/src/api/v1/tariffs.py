@@ -1,7 +1,8 @@
 from http import HTTPStatus
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, Response
 
+from core.config import settings
 from services.tariff_service import get_tariff_service, TariffService
 from schemas.tariff import TariffSchema
 
@@ -14,9 +15,18 @@ router = APIRouter()
     summary="Получение активных тарифов",
     response_description="Активные тарифы",
     response_model=list[TariffSchema],
-    status_code=HTTPStatus.OK
+    status_code=HTTPStatus.OK,
+    responses={HTTPStatus.NOT_MODIFIED.value: {"description": "Каталог не изменился"}}
 )
 async def get_tariffs(
+        if_none_match: str | None = Header(default=None),
         tariff_service: TariffService = Depends(get_tariff_service)
-) -> list[TariffService]:
-    return await tariff_service.get_active_tariffs()
+) -> Response:
+    catalog = await tariff_service.get_catalog()
+    headers = {
+        'ETag': catalog.etag,
+        'Cache-Control': f'public, max-age={settings.tariffs_max_age_in_seconds}'
+    }
+    if catalog.matches(if_none_match):
+        return Response(status_code=HTTPStatus.NOT_MODIFIED, headers=headers)
+    return Response(content=catalog.body, media_type='application/json', headers=headers)
@@ -0,0 +1,32 @@
+from http import HTTPStatus
+
+from fastapi import APIRouter, Depends, Request, Response
+
+from core.exceptions import WebhookSourceNotAllowedError
+from schemas.webhook import YookassaNotificationSchema
+from services.payment.webhook_service import WebhookService, get_webhook_service
+
+
+router = APIRouter()
+
+
+def get_client_host(request: Request) -> str | None:
+    # nginx дописывает адрес клиента в конец X-Forwarded-For
+    forwarded_for = request.headers.get('x-forwarded-for')
+    if forwarded_for:
+        return forwarded_for.split(',')[-1].strip()
+    return request.client.host if request.client else None
+
+
+@router.post('/webhook/yookassa',
+             summary="Уведомления Юkassa о статусе платежа",
+             status_code=HTTPStatus.OK)
+async def yookassa_webhook(
+        notification: YookassaNotificationSchema,
+        request: Request,
+        webhook_service: WebhookService = Depends(get_webhook_service)
+) -> Response:
+    if not webhook_service.is_allowed_source(get_client_host(request)):
+        raise WebhookSourceNotAllowedError
+    await webhook_service.handle(notification)
+    return Response(status_code=HTTPStatus.OK)
@@ -0,0 +1,153 @@
+"""Сравнение задержки запросов горячего пути до и после индексов.
+
+Данные генерируются в отдельной схеме bench, рабочие таблицы не затрагиваются.
+Запуск из контейнера billing-api после alembic upgrade head:
+
+    python -m benchmarks.indexes --users 1000000 --payments 5000000
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateIndex
+
+from core.config import settings
+from models.payment import PaymentModel
+from models.subscription import SubscriptionModel
+
+
+SCHEMA = 'bench'
+# индексы, которые были в базе до оптимизации
+BASELINE_INDEXES = {'ix_payment_id', 'ix_subscription_id'}
+
+SEED_PAYMENTS = """
+INSERT INTO payment (id, user_id, tariff_id, status, payment_method_id, payment_id,
+                     check_attempt, next_check_at, created)
+SELECT gen_random_uuid(),
+       md5((g % :users)::text)::uuid,
+       gen_random_uuid(),
+       CASE WHEN random() < 0.02 THEN 'pending' WHEN random() < 0.9 THEN 'succeeded' ELSE 'canceled' END,
+       gen_random_uuid(),
+       gen_random_uuid(),
+       0,
+       now() + random() * interval '1 hour',
+       now() - random() * interval '730 days'
+FROM generate_series(1, :payments) AS g
+"""
+SEED_SUBSCRIPTIONS = """
+INSERT INTO subscription (id, user_id, tariff_id, start_date, end_date, status, payment_id, created)
+SELECT gen_random_uuid(),
+       md5(g::text)::uuid,
+       gen_random_uuid(),
+       now() - interval '30 days',
+       now() + random() * interval '30 days',
+       CASE WHEN random() < 0.8 THEN 'active' ELSE 'canceled' END,
+       gen_random_uuid(),
+       now() - random() * interval '730 days'
+FROM generate_series(0, :users - 1) AS g
+"""
+
+QUERIES = {
+    'subscription by user and status': (
+        "SELECT * FROM subscription WHERE user_id = md5(:user::text)::uuid AND status = 'active'"
+    ),
+    'payment history page': (
+        "SELECT * FROM payment WHERE user_id = md5(:user::text)::uuid ORDER BY created DESC, id DESC LIMIT 20"
+    ),
+    'payment by provider id': (
+        "SELECT * FROM payment WHERE payment_id = (SELECT payment_id FROM payment TABLESAMPLE SYSTEM (0.01) LIMIT 1)"
+    ),
+    'due renewals batch': (
+        "SELECT * FROM subscription WHERE status = 'active' AND end_date < now() + interval '1 day' "
+        "ORDER BY end_date LIMIT 100"
+    ),
+    'due payment checks batch': (
+        "SELECT * FROM payment WHERE status = 'pending' AND next_check_at <= now() + interval '30 minutes' "
+        "ORDER BY created, id LIMIT 500"
+    ),
+}
+
+
+def prepare_schema(connection: Connection, users: int, payments: int) -> None:
+    connection.execute(text(f'DROP SCHEMA IF EXISTS {SCHEMA} CASCADE'))
+    connection.execute(text(f'CREATE SCHEMA {SCHEMA}'))
+    for table in ('payment', 'subscription'):
+        connection.execute(text(
+            f'CREATE TABLE {SCHEMA}.{table} (LIKE public.{table} INCLUDING DEFAULTS)'
+        ))
+        connection.execute(text(f'ALTER TABLE {SCHEMA}.{table} ADD PRIMARY KEY (id)'))
+    connection.execute(text(f'SET search_path TO {SCHEMA}'))
+
+    started = time.monotonic()
+    connection.execute(text(SEED_PAYMENTS), {'users': users, 'payments': payments})
+    connection.execute(text(SEED_SUBSCRIPTIONS), {'users': users})
+    connection.execute(text('ANALYZE payment, subscription'))
+    print(f'Seeded {payments} payments and {users} subscriptions in {time.monotonic() - started:.1f}s')
+
+
+def create_indexes(connection: Connection) -> None:
+    for table in (PaymentModel.__table__, SubscriptionModel.__table__):
+        for index in table.indexes:
+            if index.name in BASELINE_INDEXES:
+                continue
+            started = time.monotonic()
+            connection.execute(CreateIndex(index))
+            print(f'Created {index.name} in {time.monotonic() - started:.1f}s')
+    connection.execute(text('ANALYZE payment, subscription'))
+
+
+def measure(connection: Connection, users: int, repeat: int) -> dict[str, list[float]]:
+    timings = {}
+    for name, query in QUERIES.items():
+        latencies = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            connection.execute(text(query), {'user': random.randrange(users)}).all()
+            latencies.append((time.perf_counter() - started) * 1000)
+        timings[name] = sorted(latencies)
+    return timings
+
+
+def p95(latencies: list[float]) -> float:
+    return latencies[min(len(latencies) - 1, len(latencies) * 95 // 100)]
+
+
+def report(before: dict[str, list[float]], after: dict[str, list[float]]) -> None:
+    print(f'\n{"query":<36}{"before p50":>12}{"before p95":>12}{"after p50":>12}{"after p95":>12}{"speedup":>10}')
+    for name in QUERIES:
+        before_p50 = statistics.median(before[name])
+        after_p50 = statistics.median(after[name])
+        print(
+            f'{name:<36}{before_p50:>10.2f}ms{p95(before[name]):>10.2f}ms'
+            f'{after_p50:>10.2f}ms{p95(after[name]):>10.2f}ms{before_p50 / after_p50:>9.1f}x'
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=1_000_000)
+    parser.add_argument('--payments', type=int, default=3_000_000)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--keep', action='store_true', help='не удалять схему bench после замера')
+    args = parser.parse_args()
+
+    engine = create_engine(settings.dsn_sync, future=True)
+    with engine.connect() as connection:
+        connection = connection.execution_options(isolation_level='AUTOCOMMIT')
+        print(f'{datetime.now():%Y-%m-%d %H:%M:%S} seeding schema {SCHEMA}')
+        prepare_schema(connection, args.users, args.payments)
+        before = measure(connection, args.users, args.repeat)
+        create_indexes(connection)
+        after = measure(connection, args.users, args.repeat)
+        report(before, after)
+        if not args.keep:
+            connection.execute(text(f'DROP SCHEMA {SCHEMA} CASCADE'))
+    engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""Нагрузочный тест пользовательских сценариев billing-api.
+
+Виртуальные пользователи с фиксированной конкуренцией по кругу вызывают
+/subscribe, /history, /subscriptions и /unsubscribe. По каждому эндпоинту
+печатаются пропускная способность, p50/p95/p99 и распределение статусов.
+Токены доступа подписываются ключом billing-api, auth для теста не нужен;
+Юkassa подменяется симулятором (benchmarks.yookassa_simulator).
+
+    python -m benchmarks.load --base-url http://localhost:8001/billing-api/v1 --concurrency 50 --duration 60
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+
+import httpx
+from async_fastapi_jwt_auth import AuthJWT
+
+# настройки AuthJWT регистрируются при импорте конфига billing-api
+from core import config  # noqa: F401
+
+
+@dataclass
+class EndpointStats:
+    latencies: list[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    errors: int = 0
+
+
+def percentile(latencies: list[float], value: int) -> float:
+    return latencies[min(len(latencies) - 1, len(latencies) * value // 100)]
+
+
+async def get_token(user_id: str) -> str:
+    subject = json.dumps({'user_id': user_id, 'roles': [], 'subscription': ''})
+    return await AuthJWT().create_access_token(subject=subject, expires_time=60 * 60)
+
+
+class LoadTest:
+
+    def __init__(self, client: httpx.AsyncClient, duration: float):
+        self.client = client
+        self.deadline = time.monotonic() + duration
+        self.stats: dict[str, EndpointStats] = defaultdict(EndpointStats)
+
+    async def call(self, name: str, method: str, path: str, **kwargs) -> httpx.Response | None:
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, **kwargs)
+        except httpx.HTTPError:
+            self.stats[name].errors += 1
+            return None
+        self.stats[name].latencies.append((time.perf_counter() - started) * 1000)
+        self.stats[name].statuses[response.status_code] += 1
+        return response
+
+    async def run_user(self, tariff_id: str) -> None:
+        headers = {'Authorization': f'Bearer {await get_token(str(uuid.uuid4()))}'}
+        while time.monotonic() < self.deadline:
+            await self.call(
+                'POST /subscribe', 'POST', '/subscribe',
+                json={'tariff_id': tariff_id},
+                headers={**headers, 'Idempotency-Key': str(uuid.uuid4())}
+            )
+            await self.call('GET /history', 'GET', '/history', headers=headers)
+            await self.call('GET /subscriptions', 'GET', '/subscriptions', headers=headers)
+            await self.call('POST /unsubscribe', 'POST', '/unsubscribe', headers=headers)
+
+    def report(self, elapsed: float) -> None:
+        print(f'\n{"endpoint":<22}{"requests":>10}{"rps":>9}{"p50":>10}{"p95":>10}{"p99":>10}{"errors":>8}  statuses')
+        for name, stats in self.stats.items():
+            latencies = sorted(stats.latencies)
+            if not latencies:
+                continue
+            statuses = ', '.join(f'{status}: {count}' for status, count in sorted(stats.statuses.items()))
+            print(
+                f'{name:<22}{len(latencies):>10}{len(latencies) / elapsed:>9.1f}'
+                f'{statistics.median(latencies):>8.1f}ms{percentile(latencies, 95):>8.1f}ms'
+                f'{percentile(latencies, 99):>8.1f}ms{stats.errors:>8}  {statuses}'
+            )
+        total = sum(len(stats.latencies) for stats in self.stats.values())
+        print(f'\nTotal: {total} requests in {elapsed:.1f}s, {total / elapsed:.1f} rps')
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://localhost:8001/billing-api/v1')
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--duration', type=float, default=60)
+    args = parser.parse_args()
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30) as client:
+        tariffs = (await client.get('/tariffs')).json()
+        if not tariffs:
+            raise SystemExit('No active tariffs, create one in the admin panel first')
+
+        load_test = LoadTest(client, args.duration)
+        started = time.monotonic()
+        await asyncio.gather(*(load_test.run_user(tariffs[0]['id']) for _ in range(args.concurrency)))
+        load_test.report(time.monotonic() - started)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,185 @@
+"""Локальный симулятор Юkassa и сервиса авторизации для нагрузочных тестов.
+
+Реализует эндпоинты, которые вызывает SDK (создание и получение платежей и
+возвратов), и bulk-эндпоинт подписок auth. Задержка ответа, доля ошибок и
+время до смены статуса платежа задаются переменными окружения SIMULATOR_*.
+Запуск:
+
+    uvicorn benchmarks.yookassa_simulator:app --host 0.0.0.0 --port 8010
+
+billing-api направляется на симулятор через YOOKASSA_API_URL=http://simulator:8010/v3
+и AUTH_API_SUBSCRIPTIONS_URL=http://simulator:8010/api/v1/users/subscriptions.
+"""
+import asyncio
+import random
+import uuid
+from datetime import datetime, timezone
+from http import HTTPStatus
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class SimulatorSettings(BaseSettings):
+    latency_ms: float = 150
+    latency_jitter_ms: float = 100
+    # доли ответов 500 и 429
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    # через сколько секунд платеж с подтверждением переходит из pending
+    status_delay_seconds: float = 5
+    cancel_rate: float = 0.05
+    # куда отправлять уведомления о смене статуса, пусто - не отправлять
+    webhook_url: str | None = None
+
+    model_config = SettingsConfigDict(env_prefix="simulator_", env_file=".env")
+
+
+settings = SimulatorSettings()
+app = FastAPI(title='YookassaSimulator', default_response_class=ORJSONResponse)
+
+payments: dict[str, dict] = {}
+payments_by_key: dict[str, str] = {}
+refunds: dict[str, dict] = {}
+refunds_by_key: dict[str, str] = {}
+background_tasks: set[asyncio.Task] = set()
+
+
+def now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+
+def error(status: HTTPStatus, code: str) -> ORJSONResponse:
+    return ORJSONResponse(
+        status_code=status,
+        content={'type': 'error', 'id': str(uuid.uuid4()), 'code': code, 'description': status.phrase}
+    )
+
+
+@app.middleware('http')
+async def simulate_network(request: Request, call_next):
+    await asyncio.sleep(max(0.0, random.gauss(settings.latency_ms, settings.latency_jitter_ms)) / 1000)
+    if request.url.path.startswith('/v3/'):
+        roll = random.random()
+        if roll < settings.throttle_rate:
+            return error(HTTPStatus.TOO_MANY_REQUESTS, 'too_many_requests')
+        if roll < settings.throttle_rate + settings.error_rate:
+            return error(HTTPStatus.INTERNAL_SERVER_ERROR, 'internal_server_error')
+    return await call_next(request)
+
+
+def get_final_status() -> str:
+    return 'canceled' if random.random() < settings.cancel_rate else 'succeeded'
+
+
+def set_status(payment: dict, status: str) -> None:
+    payment['status'] = status
+    payment['paid'] = status == 'succeeded'
+    payment['refundable'] = status == 'succeeded'
+    payment.pop('confirmation', None)
+    if status == 'succeeded':
+        payment['captured_at'] = now()
+
+
+async def finish_payment(payment_id: str) -> None:
+    await asyncio.sleep(settings.status_delay_seconds)
+    payment = payments[payment_id]
+    set_status(payment, get_final_status())
+    if not settings.webhook_url:
+        return
+    notification = {'type': 'notification', 'event': f'payment.{payment["status"]}', 'object': payment}
+    async with httpx.AsyncClient() as client:
+        try:
+            await client.post(settings.webhook_url, json=notification)
+        except httpx.HTTPError:
+            pass
+
+
+@app.post('/v3/payments')
+async def create_payment(request: Request):
+    idempotence_key = request.headers.get('idempotence-key')
+    if idempotence_key in payments_by_key:
+        return payments[payments_by_key[idempotence_key]]
+
+    data = await request.json()
+    payment_id = str(uuid.uuid4())
+    payment = {
+        'id': payment_id,
+        'status': 'pending',
+        'paid': False,
+        'amount': data['amount'],
+        'description': data.get('description', ''),
+        'created_at': now(),
+        'metadata': {},
+        'recipient': {'account_id': '100500', 'gateway_id': '100700'},
+        'payment_method': {
+            'type': 'bank_card',
+            'id': data.get('payment_method_id') or str(uuid.uuid4()),
+            'saved': bool(data.get('save_payment_method') or data.get('payment_method_id')),
+        },
+        'refundable': False,
+        'test': True,
+    }
+    payments[payment_id] = payment
+    if idempotence_key:
+        payments_by_key[idempotence_key] = payment_id
+
+    if data.get('payment_method_id'):
+        # автосписание по сохраненной карте завершается сразу
+        set_status(payment, get_final_status())
+    else:
+        payment['confirmation'] = {
+            'type': 'redirect',
+            'confirmation_url': f'https://yoomoney.ru/checkout/payments/v2/contract?orderId={payment_id}',
+        }
+        task = asyncio.create_task(finish_payment(payment_id))
+        background_tasks.add(task)
+        task.add_done_callback(background_tasks.discard)
+    return payment
+
+
+@app.get('/v3/payments/{payment_id}')
+async def get_payment(payment_id: str):
+    if payment_id not in payments:
+        return error(HTTPStatus.NOT_FOUND, 'not_found')
+    return payments[payment_id]
+
+
+@app.post('/v3/refunds')
+async def create_refund(request: Request):
+    idempotence_key = request.headers.get('idempotence-key')
+    if idempotence_key in refunds_by_key:
+        return refunds[refunds_by_key[idempotence_key]]
+
+    data = await request.json()
+    payment = payments.get(data['payment_id'])
+    if not payment or not payment['refundable']:
+        return error(HTTPStatus.BAD_REQUEST, 'invalid_request')
+    refund = {
+        'id': str(uuid.uuid4()),
+        'payment_id': payment['id'],
+        'status': 'succeeded',
+        'created_at': now(),
+        'amount': data['amount'],
+    }
+    refunds[refund['id']] = refund
+    if idempotence_key:
+        refunds_by_key[idempotence_key] = refund['id']
+    # возврат полный, повторный по тому же платежу невозможен
+    payment['refundable'] = False
+    return refund
+
+
+@app.get('/v3/refunds/{refund_id}')
+async def get_refund(refund_id: str):
+    if refund_id not in refunds:
+        return error(HTTPStatus.NOT_FOUND, 'not_found')
+    return refunds[refund_id]
+
+
+@app.put('/api/v1/users/subscriptions')
+async def change_subscriptions(request: Request):
+    data = await request.json()
+    return {'updated': len(data['changes']), 'missing': []}
@@ -22,9 +22,44 @@ class PostgresSettings(BaseSettings):
     user: str = "admin"
     password: str = "123qwe"
 
+    # пул асинхронного движка, на каждый gunicorn-воркер свой:
+    # суммарно до workers * (pool_size + max_overflow) соединений
+    pool_size: int = 10
+    max_overflow: int = 10
+    pool_timeout: int = 30
+    pool_recycle: int = 60 * 30
+    pool_pre_ping: bool = True
+    # 0 нужен за pgbouncer в режиме transaction
+    statement_cache_size: int = 100
+
+    # пул синхронного движка celery-воркера, на каждый процесс свой
+    sync_pool_size: int = 5
+    sync_max_overflow: int = 5
+    sync_pool_pre_ping: bool = True
+    sync_pool_recycle: int = 60 * 30
+
     model_config = SettingsConfigDict(env_prefix="db_", env_file=".env")
 
 
+class RedisSettings(BaseSettings):
+    host: str = "redis"
+    port: int = 6379
+    db: int = 1
+
+    model_config = SettingsConfigDict(env_prefix="redis_", env_file=".env")
+
+
+class AuthHttpSettings(BaseSettings):
+    # таймауты в секундах; без них зависший auth держит воркер бесконечно
+    timeout: float = 5
+    connect_timeout: float = 2
+    max_connections: int = 50
+    retries: int = 3
+    backoff_factor: float = 0.5
+
+    model_config = SettingsConfigDict(env_prefix="auth_http_", env_file=".env")
+
+
 class CelerySettings(BaseSettings):
     broker_url: str
 
@@ -34,21 +69,89 @@ class CelerySettings(BaseSettings):
 class Setting(BaseSettings):
     postgres: PostgresSettings = PostgresSettings()
     celery: CelerySettings = CelerySettings()
+    redis: RedisSettings = RedisSettings()
+    auth_http: AuthHttpSettings = AuthHttpSettings()
     dsn: str = f'postgresql+asyncpg://{postgres.user}:{postgres.password}@{postgres.host}:{postgres.port}/{postgres.name}'
     dsn_sync: str = f'postgresql://{postgres.user}:{postgres.password}@{postgres.host}:{postgres.port}/{postgres.name}'
     yookassa_token: str
     yookassa_shopid: str
+    yookassa_api_url: str | None = None
     webhook_api_url: str
     payment_redirect_url: str
 
     AUTH_API_SUBSCRIBE_URL: str = "https://ba8b-141-136-91-48.ngrok-free.app/api/v1/users/subscribe"
     AUTH_API_UNSUBSCRIBE_URL: str = "https://ba8b-141-136-91-48.ngrok-free.app/api/v1/users/unsubscribe"
+    AUTH_API_SUBSCRIPTIONS_URL: str = "https://ba8b-141-136-91-48.ngrok-free.app/api/v1/users/subscriptions"
 
     header_key: str = "x-api-key"
     header_value: str = "11111"
+    # ключ, с которым другие сервисы обращаются к billing-api
+    service_api_key: str = "11111"
 
     auto_pay_delay: int = 60
+    leader_lease_ttl_in_seconds: int = 60
+    renewal_batch_size: int = 100
+    renewal_charge_concurrency: int = 8
+    # окно дня, по которому распределяются продления, и емкость одного временного окна
+    renewal_window_start_hour: int = 3
+    renewal_window_end_hour: int = 21
+    renewal_bucket_minutes: int = 30
+    renewal_bucket_capacity: int = 2000
+    renewal_plan_days_ahead: int = 1
+    renewal_plan_batch_size: int = 1000
+    renewal_plan_interval_in_seconds: int = 60 * 60
+    renewal_charge_retries: int = 3
+    # общий для всех воркеров лимит запросов к Юkassa
+    yookassa_rate_limit_per_second: float = 10
+    yookassa_rate_limit_burst: int = 20
+    # потоки для вызовов SDK Юkassa из асинхронных обработчиков, на каждый воркер
+    yookassa_client_concurrency: int = 16
     check_delay_in_seconds: int = 60
+    check_max_delay_in_seconds: int = 60 * 60 * 6
+    check_max_attempts: int = 12
+    check_jitter_ratio: float = 0.1
+
+    reconcile_interval_in_seconds: int = 60
+    reconcile_batch_size: int = 500
+    reconcile_concurrency: int = 16
+    # на это время пачка забирается из сверки, пока статусы запрашиваются у Юkassa
+    reconcile_claim_ttl_in_seconds: int = 300
+
+    # основной путь подтверждения оплаты - вебхук, опрос Юkassa остается запасным
+    payment_fallback_check_delay: int = 60 * 15
+    webhook_event_ttl: int = 60 * 60 * 24
+    # каталог тарифов кешируется в процессе, админка сбрасывает кеш через pub/sub
+    tariff_cache_ttl_in_seconds: int = 60 * 5
+    tariff_changes_channel: str = 'billing:tariffs:changed'
+    tariff_changes_reconnect_delay: int = 5
+    # сколько клиенты могут не перепроверять каталог тарифов
+    tariffs_max_age_in_seconds: int = 60
+    history_page_size: int = 50
+    history_max_page_size: int = 500
+    history_stream_yield_per: int = 500
+    entitlement_cache_ttl_in_seconds: int = 60 * 10
+    entitlement_batch_max_size: int = 5000
+    idempotency_ttl_in_seconds: int = 60 * 60 * 24
+    # проверенные токены доступа, на каждый воркер
+    jwt_cache_size: int = 10000
+    # сколько держится отметка о выполняемом запросе и блокировка оплаты пользователя
+    idempotency_lock_ttl_in_seconds: int = 60
+    # доставка изменений подписок в auth через outbox
+    outbox_dispatch_interval_in_seconds: int = 5
+    outbox_dispatch_max_duration_in_seconds: int = 50
+    outbox_batch_size: int = 500
+    outbox_retry_delay_in_seconds: int = 5
+    outbox_max_retry_delay_in_seconds: int = 60 * 30
+    # адреса, с которых Юkassa отправляет уведомления; пустой список отключает проверку
+    yookassa_webhook_ips: list[str] = [
+        "185.71.76.0/27",
+        "185.71.77.0/27",
+        "77.75.153.0/25",
+        "77.75.156.11",
+        "77.75.156.35",
+        "77.75.154.128/25",
+        "2a02:5180::/32",
+    ]
 
 
 settings = Setting()
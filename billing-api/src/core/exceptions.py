@@ -48,4 +48,33 @@ class AuthServiceNoResponse(BaseErrorWithContent):
 
 class AuthServiceBadResponse(BaseErrorWithContent):
     status_code = HTTPStatus.BAD_REQUEST
-    content = {'message': 'Subscription wasn\'t be created in auth service'}
\ No newline at end of file
+    content = {'message': 'Subscription wasn\'t be created in auth service'}
+
+class WebhookSourceNotAllowedError(BaseErrorWithContent):
+    status_code = HTTPStatus.FORBIDDEN
+    content = {'message': 'Notification source is not allowed'}
+
+
+class InvalidCursorError(BaseErrorWithContent):
+    status_code = HTTPStatus.BAD_REQUEST
+    content = {'message': 'Pagination cursor is invalid'}
+
+
+class ServiceKeyInvalidError(BaseErrorWithContent):
+    status_code = HTTPStatus.FORBIDDEN
+    content = {'message': 'Service API key is invalid'}
+
+
+class IdempotencyKeyInProgressError(BaseErrorWithContent):
+    status_code = HTTPStatus.CONFLICT
+    content = {'message': 'Request with this Idempotency-Key is still in progress'}
+
+
+class IdempotencyKeyReusedError(BaseErrorWithContent):
+    status_code = HTTPStatus.UNPROCESSABLE_ENTITY
+    content = {'message': 'Idempotency-Key was already used with another request'}
+
+
+class CheckoutInProgressError(BaseErrorWithContent):
+    status_code = HTTPStatus.CONFLICT
+    content = {'message': 'Another payment of the user is being created'}
@@ -0,0 +1,76 @@
+import os
+import time
+import threading
+from collections import deque
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import Pool
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from schemas.pool import PoolStatsSchema
+
+
+class PoolStats:
+    """Время ожидания соединения из пула и число таймаутов в текущем процессе."""
+
+    def __init__(self, window: int = 1000):
+        self.waits = deque(maxlen=window)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.lock = threading.Lock()
+
+    def on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        with self.lock:
+            self.checkouts += 1
+
+    def record(self, wait: float, timed_out: bool = False) -> None:
+        with self.lock:
+            self.waits.append(wait)
+            if timed_out:
+                self.timeouts += 1
+
+    @staticmethod
+    def percentile(waits: list[float], percent: int) -> float:
+        if not waits:
+            return 0.0
+        return waits[min(len(waits) - 1, len(waits) * percent // 100)]
+
+    def snapshot(self, pool: Pool, max_overflow: int) -> PoolStatsSchema:
+        with self.lock:
+            waits = sorted(self.waits)
+            checkouts, timeouts = self.checkouts, self.timeouts
+        capacity = pool.size() + max_overflow
+        return PoolStatsSchema(
+            pid=os.getpid(),
+            size=pool.size(),
+            max_overflow=max_overflow,
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+            saturation=pool.checkedout() / capacity if capacity > 0 else 0.0,
+            checkouts=checkouts,
+            timeouts=timeouts,
+            wait_p50=self.percentile(waits, 50),
+            wait_p95=self.percentile(waits, 95),
+            wait_max=waits[-1] if waits else 0.0,
+        )
+
+
+pool_stats = PoolStats()
+
+
+def instrument_pool(engine: AsyncEngine) -> None:
+    """Подписывает счетчик выдач соединений на события пула движка."""
+    event.listen(engine.sync_engine.pool, 'checkout', pool_stats.on_checkout)
+
+
+async def acquire_connection(session: AsyncSession) -> None:
+    """Берет соединение для сессии сразу и замеряет ожидание свободного соединения пула."""
+    started = time.perf_counter()
+    try:
+        await session.connection()
+    except TimeoutError:
+        pool_stats.record(time.perf_counter() - started, timed_out=True)
+        raise
+    pool_stats.record(time.perf_counter() - started)
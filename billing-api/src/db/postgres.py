@@ -1,24 +1,74 @@
-from sqlalchemy.ext.asyncio import AsyncEngine
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlmodel.ext.asyncio.session import AsyncSession, Session
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 
 from core.config import settings
+from db.pool import acquire_connection, instrument_pool
 
 
 engine: AsyncEngine | None = None
+async_session_factory: sessionmaker | None = None
+sync_engine: Engine | None = None
+sync_session_factory: sessionmaker | None = None
 Base = declarative_base()
 
 
+def init_async_engine() -> AsyncEngine:
+    """Создает движок и фабрику сессий один раз на процесс gunicorn-воркера."""
+    global engine, async_session_factory
+    engine = create_async_engine(
+        settings.dsn,
+        future=True,
+        pool_size=settings.postgres.pool_size,
+        max_overflow=settings.postgres.max_overflow,
+        pool_timeout=settings.postgres.pool_timeout,
+        pool_recycle=settings.postgres.pool_recycle,
+        pool_pre_ping=settings.postgres.pool_pre_ping,
+        connect_args={'statement_cache_size': settings.postgres.statement_cache_size},
+    )
+    instrument_pool(engine)
+    async_session_factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    return engine
+
+
 async def get_async_session() -> AsyncSession:
-    async_session = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
-    async with async_session() as session:
+    async with async_session_factory() as session:
+        await acquire_connection(session)
         yield session
 
 
-def get_sync_session() -> Session:
-    sync_engine = create_engine(settings.dsn_sync, future=True)
-    sync_session = sessionmaker(bind=sync_engine, class_=Session, expire_on_commit=False)
-    with sync_session() as session:
-        return session
+def init_sync_engine() -> None:
+    """Создает движок с пулом соединений, один на процесс celery-воркера."""
+    global sync_engine, sync_session_factory
+    sync_engine = create_engine(
+        settings.dsn_sync,
+        future=True,
+        pool_size=settings.postgres.sync_pool_size,
+        max_overflow=settings.postgres.sync_max_overflow,
+        pool_pre_ping=settings.postgres.sync_pool_pre_ping,
+        pool_recycle=settings.postgres.sync_pool_recycle,
+    )
+    sync_session_factory = sessionmaker(bind=sync_engine, class_=Session, expire_on_commit=False)
+
+
+def dispose_sync_engine() -> None:
+    global sync_engine, sync_session_factory
+    if sync_engine is not None:
+        sync_engine.dispose()
+    sync_engine = None
+    sync_session_factory = None
+
+
+@contextmanager
+def get_sync_session() -> Iterator[Session]:
+    """Сессия закрывается на выходе из блока, соединение возвращается в пул."""
+    if sync_session_factory is None:
+        init_sync_engine()
+    with sync_session_factory() as session:
+        yield session
@@ -0,0 +1,20 @@
+from redis import Redis as SyncRedis
+from redis.asyncio import Redis
+
+from core.config import settings
+
+
+redis: Redis | None = None
+sync_redis: SyncRedis | None = None
+
+
+async def get_redis() -> Redis:
+    return redis
+
+
+def get_sync_redis() -> SyncRedis:
+    """Клиент Redis для celery-задач, один на процесс."""
+    global sync_redis
+    if sync_redis is None:
+        sync_redis = SyncRedis(host=settings.redis.host, port=settings.redis.port, db=settings.redis.db)
+    return sync_redis
@@ -1,24 +1,37 @@
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI, Request
 from fastapi.responses import ORJSONResponse
-from sqlalchemy.ext.asyncio import create_async_engine
+from redis.asyncio import Redis
 
 from core.config import settings
 from core.exceptions import BaseErrorWithContent
-from db import postgres
+from db import postgres, redis_db
+from services.payment import yookassa_client
 from api.v1 import tariffs
 from api.v1 import subscription
+from api.v1 import webhook
+from api.v1 import renewals
+from api.v1 import entitlements
 from api import healthcheck
-from tasks import auto_pay
+from services.tariff_cache import listen_tariff_changes
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    postgres.engine = create_async_engine(settings.dsn, future=True)
-    auto_pay.delay()
+    postgres.init_async_engine()
+    yookassa_client.configure()
+    yookassa_client.init_executor()
+    redis_db.redis = Redis(host=settings.redis.host, port=settings.redis.port, db=settings.redis.db)
+    tariff_listener = asyncio.create_task(listen_tariff_changes(redis_db.redis))
     yield
+    tariff_listener.cancel()
+    with suppress(asyncio.CancelledError):
+        await tariff_listener
+    await redis_db.redis.close()
     await postgres.engine.dispose()
+    yookassa_client.shutdown_executor()
 
 
 app = FastAPI(
@@ -40,3 +53,6 @@ async def project_error_handler(request: Request, exc: BaseErrorWithContent):
 app.include_router(healthcheck.router, prefix="/billing-api/v1")
 app.include_router(tariffs.router, prefix="/billing-api/v1", tags=['tariffs'])
 app.include_router(subscription.router, prefix="/billing-api/v1", tags=['subscription'])
+app.include_router(webhook.router, prefix="/billing-api/v1", tags=['webhook'])
+app.include_router(renewals.router, prefix="/billing-api/v1", tags=['renewals'])
+app.include_router(entitlements.router, prefix="/billing-api/v1", tags=['entitlements'])
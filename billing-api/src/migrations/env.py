@@ -12,6 +12,7 @@ from models.tariff import TariffModel
 from models.payment import PaymentModel
 from models.refund import RefundModel
 from models.subscription import SubscriptionModel
+from models.outbox import SubscriptionOutboxModel
 
 config = context.config
 
@@ -0,0 +1,48 @@
+"""add hot path indexes
+
+Revision ID: 8e9c4be82440
+Revises: 841f605e008a
+Create Date: 2024-02-12 11:05:19.640128
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e9c4be82440'
+down_revision: Union[str, None] = '841f605e008a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY не блокирует запись в таблицы, но не работает внутри транзакции
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_subscription_user_id_status', 'subscription', ['user_id', 'status'],
+            unique=False, postgresql_concurrently=True
+        )
+        op.create_index(
+            'ux_payment_payment_id', 'payment', ['payment_id'],
+            unique=True, postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_payment_user_id_created', 'payment', ['user_id', 'created', 'id'],
+            unique=False, postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_payment_pending_next_check_at', 'payment', ['next_check_at'],
+            unique=False, postgresql_concurrently=True,
+            postgresql_where=sa.text("status = 'pending'")
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_payment_pending_next_check_at', table_name='payment', postgresql_concurrently=True)
+        op.drop_index('ix_payment_user_id_created', table_name='payment', postgresql_concurrently=True)
+        op.drop_index('ux_payment_payment_id', table_name='payment', postgresql_concurrently=True)
+        op.drop_index('ix_subscription_user_id_status', table_name='subscription', postgresql_concurrently=True)
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, BigInteger, Integer, DateTime, Identity, Index, func
+from sqlalchemy.dialects.postgresql import UUID
+
+from db.postgres import Base
+from models.mixins import TimeStampedMixin
+
+
+class SubscriptionOutboxModel(Base, TimeStampedMixin):
+    """Изменение подписки, о котором нужно сообщить сервису авторизации.
+
+    Пишется в той же транзакции, что и сама подписка, и удаляется после доставки.
+    """
+    __tablename__ = 'subscription_outbox'
+
+    # монотонный id задает порядок изменений одного пользователя
+    id = Column(BigInteger, Identity(), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), nullable=False)
+    # None - подписка отменена
+    tariff_id = Column(UUID(as_uuid=True), nullable=True)
+    attempts = Column(Integer, nullable=False, default=0, server_default='0')
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        Index('ix_subscription_outbox_next_attempt_at', 'next_attempt_at'),
+    )
@@ -1,6 +1,6 @@
 from enum import Enum
 
-from sqlalchemy import Column, ForeignKey, String
+from sqlalchemy import Column, ForeignKey, String, Integer, DateTime, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 
 from db.postgres import Base
@@ -28,3 +28,19 @@ class PaymentModel(Base, UUIDMixin, TimeStampedMixin):
     status = Column(String)
     payment_method_id = Column(UUID, nullable=False)
     payment_id = Column(UUID, nullable=False)
+    # состояние запасной проверки статуса у Юkassa
+    check_attempt = Column(Integer, nullable=False, default=0, server_default='0')
+    check_delay = Column(Integer, nullable=True)
+    next_check_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # поиск платежа по id в Юkassa: вебхуки, сверка
+        Index('ux_payment_payment_id', 'payment_id', unique=True),
+        # история платежей пользователя по (created, id)
+        Index('ix_payment_user_id_created', 'user_id', 'created', 'id'),
+        # очередь запасных проверок статуса
+        Index(
+            'ix_payment_pending_next_check_at', 'next_check_at',
+            postgresql_where=text("status = 'pending'")
+        ),
+    )
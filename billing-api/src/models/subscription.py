@@ -1,6 +1,6 @@
 from enum import Enum
 
-from sqlalchemy import Column, ForeignKey, String, DateTime
+from sqlalchemy import Column, ForeignKey, String, DateTime, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 
 from db.postgres import Base
@@ -29,3 +29,19 @@ class SubscriptionModel(Base, UUIDMixin, TimeStampedMixin):
     end_date = Column(DateTime)
     status = Column(String)
     payment_id = Column(UUID, ForeignKey(PaymentModel.id))
+    # время продления, назначенное планировщиком внутри дня окончания подписки
+    renewal_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # подписки пользователя: /subscribe, /unsubscribe, /subscriptions
+        Index('ix_subscription_user_id_status', 'user_id', 'status'),
+        # расписание продлений: только активные подписки, поиск диапазоном по end_date
+        Index(
+            'ix_subscription_active_end_date', 'end_date',
+            postgresql_where=text("status = 'active'")
+        ),
+        Index(
+            'ix_subscription_active_renewal_at', 'renewal_at',
+            postgresql_where=text("status = 'active'")
+        ),
+    )
@@ -0,0 +1,17 @@
+import datetime
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from core.config import settings
+
+
+class EntitlementSchema(BaseModel):
+    user_id: UUID
+    active: bool
+    tariff_id: UUID | None = None
+    end_date: datetime.datetime | None = None
+
+
+class EntitlementBatchSchema(BaseModel):
+    user_ids: list[UUID] = Field(min_length=1, max_length=settings.entitlement_batch_max_size)
@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+
+
+class JWTCacheStatsSchema(BaseModel):
+    pid: int
+    size: int
+    max_size: int
+    hits: int
+    misses: int
+    hit_ratio: float
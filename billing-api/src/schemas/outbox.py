@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+
+class OutboxStatsSchema(BaseModel):
+    pending: int
+    # сколько секунд ждет самое старое недоставленное изменение
+    lag_seconds: float
@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+
+
+class PoolStatsSchema(BaseModel):
+    pid: int
+    size: int
+    max_overflow: int
+    checked_out: int
+    overflow: int
+    saturation: float
+    checkouts: int
+    timeouts: int
+    wait_p50: float
+    wait_p95: float
+    wait_max: float
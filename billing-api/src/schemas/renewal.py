@@ -0,0 +1,9 @@
+import datetime
+
+from pydantic import BaseModel
+
+
+class RenewalBucketSchema(BaseModel):
+    start: datetime.datetime
+    planned: int
+    capacity: int
@@ -0,0 +1,11 @@
+import datetime
+
+from pydantic import BaseModel
+
+
+class SchedulerStateSchema(BaseModel):
+    name: str
+    leader: str | None
+    last_run_node: str | None
+    last_run_finished_at: datetime.datetime | None
+    last_run_result: str | None
@@ -16,6 +16,7 @@ class PaymentSchema(BaseModel):
     user_id: UUID
     tariff_id: UUID
     status: str
+    created: datetime.datetime | None = None
 
 
 class PaymentResponseSchema:
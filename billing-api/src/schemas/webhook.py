@@ -1,7 +1,19 @@
+from uuid import UUID
+
 from pydantic import BaseModel
 
 
-class YookassaWebhookSchema(BaseModel):
-    id: str
+class YookassaPaymentObjectSchema(BaseModel):
+    id: UUID
+    status: str
+
+
+class YookassaNotificationSchema(BaseModel):
+    type: str
     event: str
-    url: str
+    object: YookassaPaymentObjectSchema
+
+    @property
+    def event_id(self) -> str:
+        # Юkassa не присылает id уведомления, событие однозначно задается типом и объектом
+        return f'{self.event}:{self.object.id}'
@@ -1,46 +1,64 @@
-import uuid
 from http import HTTPStatus
 from uuid import UUID
 
 import requests
-from requests.exceptions import Timeout, TooManyRedirects, RequestException
-import httpx
+from requests.adapters import HTTPAdapter
+from requests.exceptions import RequestException
+from urllib3.util.retry import Retry
 
 from core.config import settings
 from core.exceptions import AuthServiceNoResponse, AuthServiceBadResponse
 
 
-def auth_subscribe(user_id: UUID, tariff_id: UUID):
-    url = settings.AUTH_API_SUBSCRIBE_URL
-    headers = {settings.header_key: settings.header_value}
-    payload = {"tariff_id": str(tariff_id)}
-    try:
-        response = requests.put(url + f'/{str(user_id)}', headers=headers, params=payload)
-    except (TooManyRedirects, RequestException, Timeout):
-        raise AuthServiceNoResponse
-    if response.status_code != HTTPStatus.OK:
-        raise AuthServiceBadResponse
+# изменения подписок доставляет в auth только диспетчер outbox в celery;
+# сессия живет все время процесса воркера и переиспользует соединения
+sync_session: requests.Session | None = None
+
+RETRY_STATUSES = (HTTPStatus.BAD_GATEWAY, HTTPStatus.SERVICE_UNAVAILABLE, HTTPStatus.GATEWAY_TIMEOUT)
+
+
+def get_headers() -> dict:
+    return {settings.header_key: settings.header_value}
 
 
-def auth_unsubscribe(user_id):
-    url = settings.AUTH_API_UNSUBSCRIBE_URL
-    headers = {settings.header_key: settings.header_value}
+def get_sync_session() -> requests.Session:
+    global sync_session
+    if sync_session is None:
+        retry = Retry(
+            total=settings.auth_http.retries,
+            backoff_factor=settings.auth_http.backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            # смена статуса подписки в auth идемпотентна, PUT можно повторять
+            allowed_methods={'PUT'},
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=settings.auth_http.max_connections,
+            max_retries=retry
+        )
+        sync_session = requests.Session()
+        sync_session.headers.update(get_headers())
+        sync_session.mount('http://', adapter)
+        sync_session.mount('https://', adapter)
+    return sync_session
+
+
+def get_sync_timeout() -> tuple[float, float]:
+    return settings.auth_http.connect_timeout, settings.auth_http.timeout
+
+
+def auth_change_subscriptions(changes: list[tuple[UUID, UUID | None]]) -> list[str]:
+    """Передает пачку изменений одним запросом и возвращает id пользователей, которых нет в auth."""
+    url = settings.AUTH_API_SUBSCRIPTIONS_URL
+    payload = {"changes": [
+        {"user_id": str(user_id), "tariff_id": str(tariff_id) if tariff_id else None}
+        for user_id, tariff_id in changes
+    ]}
     try:
-        response = requests.put(url + f'/{str(user_id)}', headers=headers)
-    except (TooManyRedirects, RequestException, Timeout):
+        response = get_sync_session().put(url, json=payload, timeout=get_sync_timeout())
+    except RequestException:
         raise AuthServiceNoResponse
     if response.status_code != HTTPStatus.OK:
         raise AuthServiceBadResponse
-
-
-async def auth_async_unsubscribe(user_id: UUID):
-    url = settings.AUTH_API_UNSUBSCRIBE_URL
-    headers = {settings.header_key: settings.header_value}
-
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.put(url + f'/{str(user_id)}', headers=headers)
-        except (TooManyRedirects, RequestException, Timeout):
-            raise AuthServiceNoResponse
-        if response.status_code != HTTPStatus.OK:
-            raise AuthServiceBadResponse
+    return response.json()["missing"]
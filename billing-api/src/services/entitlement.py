@@ -0,0 +1,132 @@
+import logging
+from typing import Iterable
+from uuid import UUID
+
+from fastapi import Depends
+from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+from redis.exceptions import RedisError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from db.postgres import get_async_session
+from db.redis_db import get_redis
+from models.subscription import SubscriptionModel, SubscriptionStatus
+from schemas.entitlement import EntitlementSchema
+
+
+ENTITLEMENT_KEY = 'billing:entitlement:{user_id}'
+
+
+def to_entitlement(user_id: UUID, subscription: SubscriptionModel | None) -> EntitlementSchema:
+    if not subscription or subscription.status != str(SubscriptionStatus.ACTIVE):
+        return EntitlementSchema(user_id=user_id, active=False)
+    return EntitlementSchema(
+        user_id=user_id,
+        active=True,
+        tariff_id=subscription.tariff_id,
+        end_date=subscription.end_date
+    )
+
+
+def get_store_pipeline(redis: Redis | AsyncRedis, entitlements: Iterable[EntitlementSchema], nx: bool = False):
+    pipeline = redis.pipeline(transaction=False)
+    for entitlement in entitlements:
+        pipeline.set(
+            ENTITLEMENT_KEY.format(user_id=entitlement.user_id),
+            entitlement.model_dump_json(),
+            ex=settings.entitlement_cache_ttl_in_seconds,
+            nx=nx
+        )
+    return pipeline
+
+
+def get_fill_pipeline(redis: Redis | AsyncRedis, entitlements: Iterable[EntitlementSchema]):
+    """Заполнение промахов значением, прочитанным из базы до записи.
+
+    SET NX не затирает свежее значение, записанное после коммита, пока шло чтение.
+    """
+    return get_store_pipeline(redis, entitlements, nx=True)
+
+
+class EntitlementCache:
+    """Запись доступа пользователей в Redis из celery-задач.
+
+    Вызывается после коммита изменений подписок. Если Redis недоступен,
+    устаревший ответ живет не дольше entitlement_cache_ttl_in_seconds.
+    """
+
+    def __init__(self, redis: Redis):
+        self.redis = redis
+
+    def store(self, subscriptions: Iterable[SubscriptionModel]) -> None:
+        entitlements = [to_entitlement(subscription.user_id, subscription) for subscription in subscriptions]
+        if not entitlements:
+            return
+        try:
+            get_store_pipeline(self.redis, entitlements).execute()
+        except RedisError:
+            logging.exception(f'Failed to cache entitlements of {len(entitlements)} users')
+
+
+class EntitlementService:
+    """Ответ на вопрос, есть ли у пользователей активная подписка.
+
+    Ответы читаются из Redis одним MGET, в Postgres идут только промахи,
+    одним запросом на всю пачку. Отсутствие подписки тоже кешируется.
+    """
+
+    def __init__(self, session: AsyncSession, redis: AsyncRedis):
+        self.session = session
+        self.redis = redis
+
+    async def get_many(self, user_ids: list[UUID]) -> list[EntitlementSchema]:
+        user_ids = list(dict.fromkeys(user_ids))
+        cached = await self.redis.mget([ENTITLEMENT_KEY.format(user_id=user_id) for user_id in user_ids])
+        entitlements = {
+            user_id: EntitlementSchema.model_validate_json(value)
+            for user_id, value in zip(user_ids, cached) if value
+        }
+
+        misses = [user_id for user_id in user_ids if user_id not in entitlements]
+        if misses:
+            loaded = await self.load(misses)
+            await self.cache(loaded, get_fill_pipeline)
+            entitlements.update((entitlement.user_id, entitlement) for entitlement in loaded)
+        return [entitlements[user_id] for user_id in user_ids]
+
+    async def get(self, user_id: UUID) -> EntitlementSchema:
+        return (await self.get_many([user_id]))[0]
+
+    async def load(self, user_ids: list[UUID]) -> list[EntitlementSchema]:
+        query = await self.session.execute(
+            select(SubscriptionModel)
+            .where(
+                SubscriptionModel.user_id.in_(user_ids),
+                SubscriptionModel.status == str(SubscriptionStatus.ACTIVE)
+            )
+            .order_by(SubscriptionModel.end_date)
+        )
+        # при нескольких активных подписках берем самую позднюю
+        subscriptions = {subscription.user_id: subscription for subscription in query.scalars().all()}
+        return [to_entitlement(user_id, subscriptions.get(user_id)) for user_id in user_ids]
+
+    async def store(self, subscriptions: Iterable[SubscriptionModel]) -> None:
+        """Записывает состояние подписок в кеш, вызывается после коммита."""
+        await self.cache([to_entitlement(subscription.user_id, subscription) for subscription in subscriptions])
+
+    async def cache(self, entitlements: list[EntitlementSchema], get_pipeline=get_store_pipeline) -> None:
+        if not entitlements:
+            return
+        try:
+            await get_pipeline(self.redis, entitlements).execute()
+        except RedisError:
+            logging.exception(f'Failed to cache entitlements of {len(entitlements)} users')
+
+
+def get_entitlement_service(
+        session: AsyncSession = Depends(get_async_session),
+        redis: AsyncRedis = Depends(get_redis)
+) -> EntitlementService:
+    return EntitlementService(session, redis)
@@ -0,0 +1,117 @@
+import hashlib
+import logging
+from http import HTTPStatus
+from typing import Awaitable, Callable
+
+import orjson
+from fastapi import Depends, Response
+from redis.asyncio import Redis
+
+from core.config import settings
+from core.exceptions import BaseErrorWithContent, IdempotencyKeyInProgressError, IdempotencyKeyReusedError
+from db.redis_db import get_redis
+from services.leader import RELEASE_SCRIPT
+
+
+IDEMPOTENCY_KEY = 'billing:idempotency:{scope}:{user_id}:{key}'
+IN_PROGRESS = 'in_progress'
+COMPLETED = 'completed'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+
+
+def get_provider_key(scope: str, user_id: str, key: str) -> str:
+    """Ключ идемпотентности для Юkassa: не длиннее 64 символов и уникален для пользователя."""
+    return hashlib.sha256(f'{scope}:{user_id}:{key}'.encode()).hexdigest()
+
+
+def is_final(status_code: int) -> bool:
+    """Сохраняются только окончательные ответы.
+
+    409 (например, параллельное оформление платежа) и 5xx временные: после
+    них ключ освобождается, и повтор с тем же ключом выполняется заново.
+    """
+    return status_code < HTTPStatus.INTERNAL_SERVER_ERROR and status_code != HTTPStatus.CONFLICT
+
+
+class IdempotencyService:
+    """Выполняет запрос с заголовком Idempotency-Key не больше одного раза.
+
+    Пока запрос выполняется, ключ помечен как занятый, и повтор получает 409.
+    Ответ, в том числе ошибка из BaseErrorWithContent, хранится
+    idempotency_ttl_in_seconds и возвращается повторам без обращения к Юkassa.
+    При непредвиденной или временной ошибке ключ освобождается, запрос можно повторить.
+    """
+
+    def __init__(self, redis: Redis):
+        self.redis = redis
+
+    async def run(
+            self,
+            scope: str,
+            user_id: str,
+            key: str,
+            fingerprint: str,
+            handler: Callable[[], Awaitable[Response]]
+    ) -> Response:
+        redis_key = IDEMPOTENCY_KEY.format(scope=scope, user_id=user_id, key=key)
+        fingerprint = hashlib.sha256(fingerprint.encode()).hexdigest()
+        record = orjson.dumps({'state': IN_PROGRESS, 'fingerprint': fingerprint})
+        if not await self.redis.set(redis_key, record, nx=True, ex=settings.idempotency_lock_ttl_in_seconds):
+            return await self.replay(redis_key, fingerprint)
+
+        try:
+            response = await handler()
+        except BaseErrorWithContent as error:
+            if is_final(error.status_code):
+                await self.store(
+                    redis_key, fingerprint, error.status_code, orjson.dumps(error.content), 'application/json'
+                )
+            else:
+                await self.release(redis_key, record)
+            raise
+        except Exception:
+            await self.release(redis_key, record)
+            raise
+        if is_final(response.status_code):
+            await self.store(redis_key, fingerprint, response.status_code, response.body, response.media_type)
+        else:
+            await self.release(redis_key, record)
+        return response
+
+    async def release(self, redis_key: str, record: bytes) -> None:
+        # запись могла истечь и достаться повтору, удаляем только свою
+        await self.redis.register_script(RELEASE_SCRIPT)(keys=[redis_key], args=[record])
+
+    async def replay(self, redis_key: str, fingerprint: str) -> Response:
+        value = await self.redis.get(redis_key)
+        if not value:
+            # запись истекла между SET и GET, выполнение уже завершилось или оборвалось
+            raise IdempotencyKeyInProgressError
+        record = orjson.loads(value)
+        if record['fingerprint'] != fingerprint:
+            raise IdempotencyKeyReusedError
+        if record['state'] != COMPLETED:
+            raise IdempotencyKeyInProgressError
+        logging.info(f'Replayed stored response for {redis_key}')
+        return Response(
+            content=record['body'],
+            status_code=record['status_code'],
+            media_type=record['media_type'],
+            headers={REPLAYED_HEADER: 'true'}
+        )
+
+    async def store(
+            self, redis_key: str, fingerprint: str, status_code: int, body: bytes, media_type: str | None
+    ) -> None:
+        record = orjson.dumps({
+            'state': COMPLETED,
+            'fingerprint': fingerprint,
+            'status_code': status_code,
+            'body': body.decode(),
+            'media_type': media_type,
+        })
+        await self.redis.set(redis_key, record, ex=settings.idempotency_ttl_in_seconds)
+
+
+def get_idempotency_service(redis: Redis = Depends(get_redis)) -> IdempotencyService:
+    return IdempotencyService(redis)
@@ -1,30 +1,105 @@
-from uuid import UUID
+import hashlib
 import json
+import os
+import time
+from collections import OrderedDict
 
-from fastapi import Depends
+from fastapi import Depends, Request
 from async_fastapi_jwt_auth import AuthJWT
 from async_fastapi_jwt_auth.exceptions import MissingTokenError, JWTDecodeError
 
+from core.config import settings, AuthJWTSettings
 from core.exceptions import UserUnauthorizedError
+from schemas.jwt_cache import JWTCacheStatsSchema
 from schemas.user import UserSchema
 
 
+class ClaimsCache:
+    """LRU-кеш проверенных токенов доступа в памяти процесса.
+
+    Ключ - sha256 токена, значение - UserSchema и время истечения токена (exp).
+    Запись живет не дольше самого токена, число записей ограничено size.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.entries: OrderedDict[str, tuple[UserSchema, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def get_key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> UserSchema | None:
+        key = self.get_key(token)
+        entry = self.entries.get(key)
+        if entry is None or entry[1] <= time.time():
+            if entry is not None:
+                del self.entries[key]
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, token: str, user: UserSchema, expires_at: float) -> None:
+        key = self.get_key(token)
+        self.entries[key] = (user, expires_at)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def snapshot(self) -> JWTCacheStatsSchema:
+        requests = self.hits + self.misses
+        return JWTCacheStatsSchema(
+            pid=os.getpid(),
+            size=len(self.entries),
+            max_size=self.size,
+            hits=self.hits,
+            misses=self.misses,
+            hit_ratio=self.hits / requests if requests else 0.0,
+        )
+
+
+claims_cache = ClaimsCache(settings.jwt_cache_size)
+jwt_settings = AuthJWTSettings()
+
+
+def get_raw_token(request: Request) -> str | None:
+    # тот же порядок, что у AuthJWT: сначала заголовок, затем cookie
+    authorization = request.headers.get('authorization')
+    if authorization:
+        scheme, _, token = authorization.partition(' ')
+        return token if scheme.lower() == 'bearer' and token else None
+    return request.cookies.get(jwt_settings.authjwt_access_cookie_key)
+
+
 class JWTService:
 
-    def __init__(self, authorize):
+    def __init__(self, authorize, cache: ClaimsCache):
         self.authorize = authorize
+        self.cache = cache
+
+    async def get_user_data(self, token: str | None) -> UserSchema:
+        if token and (user := self.cache.get(token)):
+            return user
 
-    async def get_user_data(self) -> UUID:
         try:
             await self.authorize.jwt_required()
         except (MissingTokenError, JWTDecodeError):
             raise UserUnauthorizedError
 
         user_data = json.loads(await self.authorize.get_jwt_subject())
-        return UserSchema(**user_data)
+        user = UserSchema(**user_data)
+        claims = await self.authorize.get_raw_jwt()
+        if token and claims.get('exp'):
+            self.cache.put(token, user, claims['exp'])
+        return user
 
 
 async def get_user_data_from_jwt(
+        request: Request,
         authorize: AuthJWT = Depends()
 ):
-    return await JWTService(authorize).get_user_data()
+    return await JWTService(authorize, claims_cache).get_user_data(get_raw_token(request))
@@ -0,0 +1,98 @@
+import logging
+import os
+import socket
+import threading
+from datetime import datetime, timezone
+
+from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+
+from schemas.scheduler import SchedulerStateSchema
+
+
+LEADER_KEY = 'billing:leader:{name}'
+LAST_RUN_KEY = 'billing:leader:{name}:last_run'
+
+# продлеваем и освобождаем аренду, только если она все еще наша
+RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class LeaderLease:
+    """Аренда лидерства в Redis.
+
+    Лидер продлевает аренду из фонового потока каждые ttl / 3 секунд. Если узел
+    падает, ключ истекает через ttl и лидерство забирает следующий узел.
+    """
+
+    def __init__(self, redis: Redis, name: str, ttl: int):
+        self.redis = redis
+        self.name = name
+        self.key = LEADER_KEY.format(name=name)
+        self.ttl_ms = ttl * 1000
+        self.node = f'{socket.gethostname()}:{os.getpid()}'
+        self.held = threading.Event()
+        self.stopped = threading.Event()
+        self.renewer: threading.Thread | None = None
+        self.renew_script = redis.register_script(RENEW_SCRIPT)
+        self.release_script = redis.register_script(RELEASE_SCRIPT)
+
+    def acquire(self) -> bool:
+        if not self.redis.set(self.key, self.node, nx=True, px=self.ttl_ms):
+            return False
+        self.held.set()
+        self.stopped.clear()
+        self.renewer = threading.Thread(target=self.renew_loop, daemon=True)
+        self.renewer.start()
+        return True
+
+    def renew_loop(self) -> None:
+        while not self.stopped.wait(self.ttl_ms / 3000):
+            try:
+                renewed = self.renew_script(keys=[self.key], args=[self.node, self.ttl_ms])
+            except Exception:
+                # не знаем, продлена ли аренда: считаем ее потерянной, проход остановится
+                logging.exception(f'Failed to renew {self.name} lease on {self.node}')
+                renewed = False
+            if not renewed:
+                self.held.clear()
+                return
+
+    @property
+    def is_held(self) -> bool:
+        return self.held.is_set()
+
+    def release(self, result: str | None = None) -> None:
+        self.stopped.set()
+        if self.renewer:
+            self.renewer.join()
+        if self.is_held:
+            self.redis.hset(LAST_RUN_KEY.format(name=self.name), mapping={
+                'node': self.node,
+                'finished_at': datetime.now(timezone.utc).isoformat(),
+                'result': result or '',
+            })
+            self.release_script(keys=[self.key], args=[self.node])
+        self.held.clear()
+
+
+async def get_scheduler_state(redis: AsyncRedis, name: str) -> SchedulerStateSchema:
+    leader = await redis.get(LEADER_KEY.format(name=name))
+    last_run = await redis.hgetall(LAST_RUN_KEY.format(name=name))
+    return SchedulerStateSchema(
+        name=name,
+        leader=leader.decode() if leader else None,
+        last_run_node=last_run[b'node'].decode() if last_run else None,
+        last_run_finished_at=last_run[b'finished_at'].decode() if last_run else None,
+        last_run_result=last_run[b'result'].decode() if last_run else None,
+    )
@@ -0,0 +1,163 @@
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from uuid import UUID
+
+from sqlalchemy import select, delete, update, values, column, literal_column, cast, func, String, BigInteger, Integer
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from models.outbox import SubscriptionOutboxModel
+from schemas.outbox import OutboxStatsSchema
+from services.auth_service import auth_change_subscriptions
+
+
+def enqueue_subscription_change(session, user_id: UUID, tariff_id: UUID | None) -> None:
+    """Добавляет уведомление для auth в текущую транзакцию, tariff_id=None - отмена подписки.
+
+    Подходит и для синхронной, и для асинхронной сессии: add не обращается к базе.
+    """
+    session.add(SubscriptionOutboxModel(user_id=user_id, tariff_id=tariff_id))
+
+
+def get_retry_delay(attempt: int) -> int:
+    return min(settings.outbox_retry_delay_in_seconds * 2 ** attempt, settings.outbox_max_retry_delay_in_seconds)
+
+
+@dataclass
+class DispatchReport:
+    delivered: int = 0
+    coalesced: int = 0
+    failed: int = 0
+    batches: int = 0
+    # сколько секунд самое старое доставленное изменение ждало в outbox
+    max_lag: float = 0
+
+
+class OutboxDispatcher:
+    """Доставляет изменения подписок из outbox в сервис авторизации.
+
+    Записи забираются пачками в порядке id. Внутри пачки изменения одного
+    пользователя схлопываются в последнее, остальные удаляются без отправки,
+    вся пачка уходит в auth одним запросом. Неудачная пачка откладывается
+    с экспоненциальной паузой и не теряется.
+    Запускается под арендой лидерства, чтобы изменения одного пользователя
+    не доставлялись параллельно и не в том порядке.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def run(self) -> DispatchReport:
+        report = DispatchReport()
+        started = time.monotonic()
+        while time.monotonic() - started < settings.outbox_dispatch_max_duration_in_seconds:
+            delivered = self.dispatch_batch(report)
+            if delivered is None:
+                break
+            report.batches += 1
+            if not delivered:
+                # auth недоступен, следующая пачка упадет так же
+                break
+        return report
+
+    def dispatch_batch(self, report: DispatchReport) -> int | None:
+        """Доставляет одну пачку и возвращает число доставленных изменений, None - outbox пуст."""
+        now = datetime.now(timezone.utc)
+        rows = self.session.scalars(
+            select(SubscriptionOutboxModel)
+            .where(SubscriptionOutboxModel.next_attempt_at <= now)
+            .order_by(SubscriptionOutboxModel.id)
+            .limit(settings.outbox_batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not rows:
+            return None
+
+        latest: dict[UUID, SubscriptionOutboxModel] = {}
+        for row in rows:
+            latest[row.user_id] = row
+        changes = list(latest.values())
+        if self.deliver(changes):
+            delivered, failed = changes, []
+        else:
+            delivered, failed = [], changes
+
+        # более ранние изменения пользователя устарели независимо от исхода доставки
+        self.delete_superseded(changes)
+        if delivered:
+            self.session.execute(
+                delete(SubscriptionOutboxModel)
+                .where(SubscriptionOutboxModel.id.in_([change.id for change in delivered]))
+                .execution_options(synchronize_session=False)
+            )
+        if failed:
+            self.postpone(failed)
+        self.session.commit()
+
+        delivered_users = {change.user_id for change in delivered}
+        lags = [(now - row.created).total_seconds() for row in rows if row.user_id in delivered_users]
+        report.max_lag = max([report.max_lag, *lags])
+        report.delivered += len(delivered)
+        report.failed += len(failed)
+        report.coalesced += len(rows) - len(changes)
+        self.session.expunge_all()
+        return len(delivered)
+
+    def delete_superseded(self, changes: list[SubscriptionOutboxModel]) -> None:
+        latest = values(
+            column('user_id', String),
+            column('id', BigInteger),
+            name='latest'
+        ).data([(str(change.user_id), change.id) for change in changes])
+        self.session.execute(
+            delete(SubscriptionOutboxModel)
+            .where(
+                SubscriptionOutboxModel.user_id == cast(latest.c.user_id, PG_UUID),
+                SubscriptionOutboxModel.id < latest.c.id
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    def postpone(self, failed: list[SubscriptionOutboxModel]) -> None:
+        retries = values(
+            column('id', BigInteger),
+            column('attempts', Integer),
+            column('delay', Integer),
+            name='retries'
+        ).data([(change.id, change.attempts + 1, get_retry_delay(change.attempts)) for change in failed])
+        self.session.execute(
+            update(SubscriptionOutboxModel)
+            .where(SubscriptionOutboxModel.id == retries.c.id)
+            .values(
+                attempts=retries.c.attempts,
+                next_attempt_at=func.now() + literal_column("interval '1 second'") * retries.c.delay
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def deliver(changes: list[SubscriptionOutboxModel]) -> bool:
+        try:
+            missing = auth_change_subscriptions([(change.user_id, change.tariff_id) for change in changes])
+        except Exception as error:
+            logging.warning(f'Failed to deliver {len(changes)} subscription changes to auth: {error!r}')
+            return False
+        if missing:
+            logging.warning(f'Auth does not know {len(missing)} users: {", ".join(missing[:10])}')
+        return True
+
+
+async def get_outbox_stats(session: AsyncSession) -> OutboxStatsSchema:
+    """Размер очереди и возраст самого старого недоставленного изменения."""
+    query = await session.execute(
+        select(func.count(), func.min(SubscriptionOutboxModel.created))
+    )
+    pending, oldest = query.one()
+    return OutboxStatsSchema(
+        pending=pending,
+        lag_seconds=(datetime.now(timezone.utc) - oldest).total_seconds() if oldest else 0
+    )
@@ -0,0 +1,26 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+from core.config import settings
+from models.payment import PaymentModel
+
+
+def get_check_delay(attempt: int) -> int:
+    """Экспоненциальная задержка перед попыткой attempt с ограничением сверху и джиттером."""
+    delay = min(settings.check_delay_in_seconds * 2 ** attempt, settings.check_max_delay_in_seconds)
+    return int(delay + random.uniform(0, delay * settings.check_jitter_ratio))
+
+
+def get_next_check_at(delay: int) -> datetime:
+    return datetime.now(timezone.utc) + timedelta(seconds=delay)
+
+
+def schedule_check(payment: PaymentModel, attempt: int, delay: int) -> None:
+    payment.check_attempt = attempt
+    payment.check_delay = delay
+    payment.next_check_at = get_next_check_at(delay)
+
+
+def stop_checks(payment: PaymentModel) -> None:
+    payment.check_delay = None
+    payment.next_check_at = None
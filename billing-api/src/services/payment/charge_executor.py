@@ -0,0 +1,92 @@
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from yookassa import Payment
+from yookassa.domain.exceptions.too_many_request_error import TooManyRequestsError
+from yookassa.domain.response import PaymentResponse
+
+from core.config import settings
+from services.rate_limiter import TokenBucket
+
+
+@dataclass
+class ChargeResult:
+    payment: PaymentResponse | None = None
+    error: Exception | None = None
+
+
+@dataclass
+class ChargeStats:
+    charges: int = 0
+    errors: int = 0
+    # ожидания общего лимита и ответы 429 от Юkassa
+    throttled: int = 0
+    provider_throttled: int = 0
+    latencies: list[float] = field(default_factory=list)
+    started: float = field(default_factory=time.monotonic)
+
+    def percentile(self, percent: int) -> float:
+        if not self.latencies:
+            return 0.0
+        latencies = sorted(self.latencies)
+        return latencies[min(len(latencies) - 1, len(latencies) * percent // 100)]
+
+    def summary(self) -> str:
+        elapsed = time.monotonic() - self.started
+        rate = self.charges / elapsed if elapsed else 0.0
+        return (
+            f"{self.charges} charges ({rate:.1f}/s), {self.errors} errors, "
+            f"latency p50={self.percentile(50):.3f}s p95={self.percentile(95):.3f}s "
+            f"p99={self.percentile(99):.3f}s, throttled {self.throttled} times locally "
+            f"and {self.provider_throttled} times by provider"
+        )
+
+
+class ChargeExecutor:
+    """Выполняет списания в Юkassa параллельно в пределах общего лимита запросов."""
+
+    def __init__(self, executor: ThreadPoolExecutor, rate_limiter: TokenBucket):
+        self.executor = executor
+        self.rate_limiter = rate_limiter
+        self.stats = ChargeStats()
+        self.lock = threading.Lock()
+
+    def charge_all(self, requests: list[tuple[dict, str]]) -> list[ChargeResult]:
+        """Принимает пары (payload, idempotency_key), порядок результатов совпадает с запросами."""
+        return list(self.executor.map(lambda request: self.charge(*request), requests))
+
+    def charge(self, payload: dict, idempotency_key: str) -> ChargeResult:
+        attempt = 0
+        while True:
+            throttled = self.rate_limiter.acquire()
+            started = time.monotonic()
+            try:
+                # ключ идемпотентности делает повтор после 429 безопасным
+                payment = Payment.create(payload, idempotency_key)
+            except TooManyRequestsError as error:
+                self.record(throttled, time.monotonic() - started, provider_throttled=True)
+                if attempt == settings.renewal_charge_retries:
+                    return ChargeResult(error=error)
+                time.sleep(2 ** attempt)
+                attempt += 1
+                continue
+            except Exception as error:
+                logging.exception(f'Charge {idempotency_key} failed')
+                self.record(throttled, time.monotonic() - started, error=True)
+                return ChargeResult(error=error)
+            self.record(throttled, time.monotonic() - started)
+            return ChargeResult(payment=payment)
+
+    def record(self, throttled: int, latency: float, error: bool = False, provider_throttled: bool = False) -> None:
+        with self.lock:
+            self.stats.throttled += throttled
+            self.stats.latencies.append(latency)
+            if provider_throttled:
+                self.stats.provider_throttled += 1
+            elif error:
+                self.stats.errors += 1
+            else:
+                self.stats.charges += 1
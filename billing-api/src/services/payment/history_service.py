@@ -0,0 +1,87 @@
+import base64
+import binascii
+from datetime import datetime
+from typing import AsyncIterator
+from uuid import UUID
+
+import orjson
+from fastapi import Depends
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from core.exceptions import InvalidCursorError
+from db import postgres
+from db.postgres import get_async_session
+from models.payment import PaymentModel
+from schemas.tariff import PaymentSchema
+
+
+def encode_cursor(created: datetime, payment_id: UUID) -> str:
+    return base64.urlsafe_b64encode(f'{created.isoformat()}|{payment_id}'.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        created, payment_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(created), UUID(payment_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursorError
+
+
+class PaymentHistoryService:
+    """История платежей пользователя, от новых к старым.
+
+    Страницы выбираются keyset-пагинацией по (created, id) и идут по индексу
+    ix_payment_user_id_created, поэтому стоимость страницы не зависит от ее номера.
+    Выгрузка целиком отдается потоком NDJSON через серверный курсор.
+    """
+
+    columns = (
+        PaymentModel.id,
+        PaymentModel.user_id,
+        PaymentModel.tariff_id,
+        PaymentModel.status,
+        PaymentModel.created
+    )
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    def get_query(self, user_id: UUID):
+        return (
+            select(*self.columns)
+            .where(PaymentModel.user_id == user_id)
+            .order_by(PaymentModel.created.desc(), PaymentModel.id.desc())
+        )
+
+    async def get_page(
+            self, user_id: UUID, limit: int, cursor: str | None = None
+    ) -> tuple[list[PaymentSchema], str | None]:
+        """Возвращает страницу и курсор следующей страницы, если она есть."""
+        query = self.get_query(user_id).limit(limit + 1)
+        if cursor:
+            query = query.where(tuple_(PaymentModel.created, PaymentModel.id) < decode_cursor(cursor))
+        rows = (await self.session.execute(query)).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].created, rows[-1].id)
+        return [PaymentSchema(**row._mapping) for row in rows], next_cursor
+
+    async def stream(self, user_id: UUID) -> AsyncIterator[bytes]:
+        """Построчно отдает всю историю, в памяти держится не больше одной пачки строк."""
+        # у потока своя сессия: он продолжает читать после выхода из обработчика
+        async with postgres.async_session_factory() as session:
+            result = await session.stream(
+                self.get_query(user_id).execution_options(yield_per=settings.history_stream_yield_per)
+            )
+            async for row in result:
+                yield orjson.dumps(PaymentSchema(**row._mapping).model_dump(mode='json')) + b'\n'
+
+
+def get_payment_history_service(
+        session: AsyncSession = Depends(get_async_session)
+):
+    return PaymentHistoryService(session)
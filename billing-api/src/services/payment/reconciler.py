@@ -0,0 +1,182 @@
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from uuid import UUID
+
+from sqlalchemy import select, update, values, column, cast, tuple_, String, Integer, DateTime
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Session
+from yookassa import Payment
+
+from core.config import settings
+from models.payment import PaymentModel, PaymentStatus
+from models.subscription import SubscriptionModel
+from services.entitlement import EntitlementCache
+from services.payment.backoff import get_check_delay, get_next_check_at
+from services.payment.transitions import activate_subscription
+from services.rate_limiter import TokenBucket
+
+
+@dataclass
+class ReconcileReport:
+    checked: int = 0
+    changed: int = 0
+    batches: int = 0
+    activated: int = 0
+
+
+class PaymentReconciler:
+    """Сверяет зависшие в pending платежи с Юkassa пачками.
+
+    Платежи выбираются keyset-пагинацией по (created, id) среди тех, чья очередная
+    проверка уже наступила. Пачка забирается сдвигом next_check_at и коммитом, так
+    что блокировки строк не держатся, пока статусы запрашиваются ограниченным пулом
+    потоков. Изменения пачки записываются одним UPDATE ... FROM (VALUES ...) только
+    для платежей, которые все еще в pending: вебхук мог обработать их раньше.
+    """
+
+    def __init__(
+            self,
+            session: Session,
+            executor: ThreadPoolExecutor,
+            entitlements: EntitlementCache,
+            rate_limiter: TokenBucket
+    ):
+        self.session = session
+        self.executor = executor
+        self.entitlements = entitlements
+        self.rate_limiter = rate_limiter
+
+    def run(self) -> ReconcileReport:
+        report = ReconcileReport()
+        now = datetime.now(timezone.utc)
+        cursor = None
+        while batch := self.claim_batch(now, cursor):
+            started = time.monotonic()
+            statuses = self.fetch_statuses(batch)
+            changed, activated = self.apply_batch(batch, statuses)
+            self.session.commit()
+            self.entitlements.store(activated)
+            latency = time.monotonic() - started
+
+            report.batches += 1
+            report.checked += len(batch)
+            report.changed += changed
+            report.activated += len(activated)
+            logging.info(
+                f'Reconciled batch #{report.batches}: {len(batch)} payments, '
+                f'{changed} changed, {latency:.3f}s'
+            )
+            cursor = (batch[-1].created, batch[-1].id)
+        return report
+
+    def claim_batch(self, now: datetime, cursor: tuple | None) -> list:
+        """Забирает пачку у параллельных сверок и снимает блокировки до запросов к Юkassa.
+
+        Если воркер упадет, платежи вернутся в сверку через reconcile_claim_ttl_in_seconds.
+        """
+        batch = self.get_batch(now, cursor)
+        if batch:
+            self.session.execute(
+                update(PaymentModel)
+                .where(PaymentModel.id.in_([row.id for row in batch]))
+                .values(next_check_at=get_next_check_at(settings.reconcile_claim_ttl_in_seconds))
+                .execution_options(synchronize_session=False)
+            )
+        self.session.commit()
+        return batch
+
+    def get_batch(self, now: datetime, cursor: tuple | None) -> list:
+        query = (
+            select(PaymentModel.id, PaymentModel.payment_id, PaymentModel.check_attempt, PaymentModel.created)
+            .where(
+                PaymentModel.status == str(PaymentStatus.PENDING),
+                PaymentModel.next_check_at <= now
+            )
+            .order_by(PaymentModel.created, PaymentModel.id)
+            .limit(settings.reconcile_batch_size)
+            # параллельный запуск сверки пропускает чужие пачки
+            .with_for_update(skip_locked=True)
+        )
+        if cursor:
+            query = query.where(tuple_(PaymentModel.created, PaymentModel.id) > cursor)
+        return self.session.execute(query).all()
+
+    def fetch_statuses(self, batch: list) -> list[str | None]:
+        return list(self.executor.map(self.fetch_status, [row.payment_id for row in batch]))
+
+    def fetch_status(self, payment_id: UUID) -> str | None:
+        try:
+            self.rate_limiter.acquire()
+            return Payment.find_one(str(payment_id)).status
+        except Exception:
+            logging.exception(f'Payment {payment_id}: failed to fetch status')
+            return None
+
+    def apply_batch(self, batch: list, statuses: list[str | None]) -> tuple[int, list[SubscriptionModel]]:
+        rows = []
+        for row, status in zip(batch, statuses):
+            if status and status != str(PaymentStatus.PENDING):
+                rows.append((row.id, status, row.check_attempt, None, None))
+                continue
+
+            next_attempt = row.check_attempt + 1
+            if next_attempt >= settings.check_max_attempts:
+                logging.warning(f'Payment {row.payment_id} is still pending after {next_attempt} checks')
+                rows.append((row.id, str(PaymentStatus.PENDING), row.check_attempt, None, None))
+            else:
+                delay = get_check_delay(next_attempt)
+                rows.append((row.id, str(PaymentStatus.PENDING), next_attempt, delay, get_next_check_at(delay)))
+
+        updated = self.bulk_update(rows)
+        changed = [payment_id for payment_id, status in updated if status != str(PaymentStatus.PENDING)]
+        succeeded_ids = [payment_id for payment_id, status in updated if status == str(PaymentStatus.SUCCEEDED)]
+
+        activated = []
+        if succeeded_ids:
+            payments = self.session.scalars(select(PaymentModel).where(PaymentModel.id.in_(succeeded_ids)))
+            for payment in payments:
+                activated.append(activate_subscription(self.session, payment))
+        return len(changed), activated
+
+    def bulk_update(self, rows: list[tuple]) -> list[tuple]:
+        """Возвращает (id, status) обновленных платежей.
+
+        Платежи, которые после захвата пачки уже обработал вебхук, не трогаем.
+        """
+        changes = values(
+            column('id', String),
+            column('status', String),
+            column('check_attempt', String),
+            column('check_delay', String),
+            column('next_check_at', String),
+            name='changes'
+        ).data([
+            (
+                str(payment_id),
+                status,
+                str(attempt),
+                str(delay) if delay is not None else None,
+                next_check_at.isoformat() if next_check_at else None
+            )
+            for payment_id, status, attempt, delay, next_check_at in rows
+        ])
+        # значения VALUES приходят текстом, приводим их к типам колонок явно
+        query = self.session.execute(
+            update(PaymentModel)
+            .where(
+                PaymentModel.id == cast(changes.c.id, PG_UUID),
+                PaymentModel.status == str(PaymentStatus.PENDING)
+            )
+            .values(
+                status=changes.c.status,
+                check_attempt=cast(changes.c.check_attempt, Integer),
+                check_delay=cast(changes.c.check_delay, Integer),
+                next_check_at=cast(changes.c.next_check_at, DateTime(timezone=True))
+            )
+            .returning(PaymentModel.id, PaymentModel.status)
+            .execution_options(synchronize_session=False)
+        )
+        return query.all()
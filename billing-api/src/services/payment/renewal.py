@@ -0,0 +1,141 @@
+import uuid
+from dataclasses import dataclass, field
+from typing import Callable
+from datetime import datetime, timedelta
+from uuid import UUID
+
+from sqlalchemy import select, or_, and_
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from models.payment import PaymentModel, PaymentStatus
+from models.subscription import SubscriptionModel, SubscriptionStatus
+from models.tariff import TariffModel
+from services.entitlement import EntitlementCache
+from services.outbox import enqueue_subscription_change
+from services.payment.charge_executor import ChargeExecutor
+
+
+@dataclass
+class RenewalReport:
+    renewed: int = 0
+    batches: int = 0
+    failed: set[UUID] = field(default_factory=set)
+    canceled_users: list[UUID] = field(default_factory=list)
+
+
+class RenewalEngine:
+    """Продлевает подписки, срок которых подошел.
+
+    Подписки забираются небольшими пачками через SELECT ... FOR UPDATE SKIP LOCKED,
+    поэтому любое число воркеров может работать одновременно, не продлевая одну
+    подписку дважды. Тариф и предыдущий платеж загружаются тем же запросом,
+    списания пачки выполняются параллельно, результат фиксируется одним коммитом.
+    Память ограничена размером пачки (renewal_batch_size), а не числом подписок.
+    """
+
+    def __init__(self, session: Session, charge_executor: ChargeExecutor, entitlements: EntitlementCache):
+        self.session = session
+        self.charge_executor = charge_executor
+        self.entitlements = entitlements
+
+    def run(self, is_active: Callable[[], bool] = lambda: True) -> RenewalReport:
+        """Продлевает пачки, пока есть подходящие подписки и is_active() истинно."""
+        report = RenewalReport()
+        while is_active() and self.renew_batch(report):
+            report.batches += 1
+        return report
+
+    def get_due_query(self, exclude: set[UUID]):
+        now = datetime.now()
+        query = (
+            select(SubscriptionModel, TariffModel, PaymentModel)
+            .join(TariffModel, TariffModel.id == SubscriptionModel.tariff_id)
+            .join(PaymentModel, PaymentModel.id == SubscriptionModel.payment_id)
+            .where(
+                # оба условия попадают в частичные индексы; подписки, не распланированные
+                # планировщиком, продлеваются по факту окончания, в том числе после простоя
+                or_(
+                    SubscriptionModel.renewal_at <= now,
+                    and_(SubscriptionModel.renewal_at.is_(None), SubscriptionModel.end_date < now)
+                ),
+                SubscriptionModel.status == str(SubscriptionStatus.ACTIVE)
+            )
+            .order_by(SubscriptionModel.end_date)
+            .limit(settings.renewal_batch_size)
+            .with_for_update(of=SubscriptionModel, skip_locked=True)
+        )
+        if exclude:
+            # подписки, которые не удалось продлить в этом проходе, не забираем повторно
+            query = query.where(SubscriptionModel.id.not_in(exclude))
+        return query
+
+    def renew_batch(self, report: RenewalReport) -> int:
+        """Продлевает одну пачку и возвращает число забранных подписок."""
+        claimed = list(self.session.execute(self.get_due_query(report.failed)))
+        if not claimed:
+            return 0
+
+        results = self.charge_executor.charge_all([
+            (self.get_payment_payload(tariff, old_payment), self.get_idempotency_key(subscription))
+            for subscription, tariff, old_payment in claimed
+        ])
+
+        renewals = []
+        for (subscription, tariff, _), result in zip(claimed, results):
+            if result.error:
+                report.failed.add(subscription.id)
+                continue
+            new_payment = PaymentModel(
+                id=uuid.uuid4(),
+                user_id=subscription.user_id,
+                tariff_id=tariff.id,
+                status=result.payment.status,
+                payment_method_id=result.payment.payment_method.id,
+                payment_id=result.payment.id
+            )
+            renewals.append((subscription, tariff, new_payment))
+
+        # платежи вставляются до обновления подписок, которые на них ссылаются
+        self.session.add_all([new_payment for _, _, new_payment in renewals])
+        self.session.flush()
+        for subscription, tariff, new_payment in renewals:
+            self.apply_renewal(subscription, tariff, new_payment)
+        self.session.commit()
+        self.entitlements.store(subscription for subscription, _, _ in renewals)
+
+        report.renewed += len(renewals)
+        report.canceled_users.extend(
+            subscription.user_id for subscription, _, _ in renewals
+            if subscription.status == str(SubscriptionStatus.CANCELED)
+        )
+        self.session.expunge_all()
+        return len(claimed)
+
+    def apply_renewal(self, subscription: SubscriptionModel, tariff: TariffModel, payment: PaymentModel) -> None:
+        subscription.payment_id = payment.id
+        subscription.renewal_at = None
+        if payment.status == str(PaymentStatus.SUCCEEDED):
+            # планировщик продлевает в течение дня окончания, иногда раньше end_date;
+            # новый период начинается после оплаченного, а не с момента списания
+            subscription.end_date = max(subscription.end_date, datetime.now()) + timedelta(days=tariff.duration)
+        else:
+            subscription.status = str(SubscriptionStatus.CANCELED)
+            enqueue_subscription_change(self.session, subscription.user_id, None)
+
+    @staticmethod
+    def get_payment_payload(tariff: TariffModel, old_payment: PaymentModel) -> dict:
+        return {
+            "amount": {
+                "value": str(tariff.price),
+                "currency": tariff.currency
+            },
+            "capture": True,
+            "payment_method_id": str(old_payment.payment_method_id),
+            "description": tariff.description
+        }
+
+    @staticmethod
+    def get_idempotency_key(subscription: SubscriptionModel) -> str:
+        # повторная попытка продления того же периода не создаст второй платеж
+        return f'renewal-{subscription.id}-{subscription.end_date:%Y%m%d}'
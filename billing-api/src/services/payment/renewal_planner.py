@@ -0,0 +1,126 @@
+import logging
+from collections import Counter
+from datetime import datetime, timedelta, date, time
+from uuid import UUID
+
+from sqlalchemy import select, update, func, values, column, cast, String, DateTime
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from models.subscription import SubscriptionModel, SubscriptionStatus
+
+
+def get_buckets(day: date, now: datetime | None = None) -> list[datetime]:
+    """Начала временных окон продления внутри дня.
+
+    Для текущего дня возвращаются только еще не наступившие окна.
+    """
+    start = datetime.combine(day, time(hour=settings.renewal_window_start_hour))
+    end = datetime.combine(day, time(hour=settings.renewal_window_end_hour))
+    step = timedelta(minutes=settings.renewal_bucket_minutes)
+    buckets = []
+    while start < end:
+        buckets.append(start)
+        start += step
+    if now:
+        buckets = [bucket for bucket in buckets if bucket >= now]
+    return buckets
+
+
+def pick_bucket(user_id: UUID, buckets: list[datetime], load: Counter) -> datetime:
+    """Окно выбирается стабильным хешем пользователя, переполненные окна пропускаются."""
+    preferred = UUID(str(user_id)).int % len(buckets)
+    for shift in range(len(buckets)):
+        bucket = buckets[(preferred + shift) % len(buckets)]
+        if load[bucket] < settings.renewal_bucket_capacity:
+            return bucket
+    return min(buckets, key=lambda bucket: load[bucket])
+
+
+class RenewalPlanner:
+    """Распределяет продления подписок по временным окнам дня окончания.
+
+    Подписке без назначенного времени проставляется renewal_at - начало окна,
+    выбранного по хешу user_id с учетом емкости окна. Так нагрузка на Юkassa,
+    Postgres и сервис авторизации растягивается на весь день.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+        self.loads: dict[date, Counter] = {}
+
+    def run(self) -> dict[date, Counter]:
+        now = datetime.now()
+        horizon = datetime.combine(now.date() + timedelta(days=settings.renewal_plan_days_ahead + 1), time.min)
+        query = (
+            select(SubscriptionModel.id, SubscriptionModel.user_id, SubscriptionModel.end_date)
+            .where(
+                SubscriptionModel.end_date < horizon,
+                SubscriptionModel.status == str(SubscriptionStatus.ACTIVE),
+                SubscriptionModel.renewal_at.is_(None)
+            )
+            # подписки, которые сейчас продлевает RenewalEngine, пропускаем
+            .with_for_update(skip_locked=True)
+            .execution_options(yield_per=settings.renewal_plan_batch_size)
+        )
+        for partition in self.session.execute(query).partitions():
+            self.save_plan([
+                (row.id, row.end_date, self.plan(row.user_id, max(now.date(), row.end_date.date()), now))
+                for row in partition
+            ])
+        self.session.commit()
+
+        for day, load in self.loads.items():
+            overloaded = [bucket for bucket, planned in load.items() if planned > settings.renewal_bucket_capacity]
+            if overloaded:
+                logging.warning(f'Renewal plan for {day}: {len(overloaded)} buckets over capacity')
+        return self.loads
+
+    def save_plan(self, rows: list[tuple[UUID, datetime, datetime]]) -> None:
+        """Записывает renewal_at, только если подписку не продлили после выборки.
+
+        Продленная подписка получает новый end_date, и время продления за старый
+        период привело бы к повторному списанию.
+        """
+        changes = values(
+            column('id', String),
+            column('end_date', String),
+            column('renewal_at', String),
+            name='changes'
+        ).data([
+            (str(subscription_id), end_date.isoformat(), renewal_at.isoformat())
+            for subscription_id, end_date, renewal_at in rows
+        ])
+        self.session.execute(
+            update(SubscriptionModel)
+            .where(
+                SubscriptionModel.id == cast(changes.c.id, PG_UUID),
+                SubscriptionModel.end_date == cast(changes.c.end_date, DateTime),
+                SubscriptionModel.renewal_at.is_(None),
+                SubscriptionModel.status == str(SubscriptionStatus.ACTIVE)
+            )
+            .values(renewal_at=cast(changes.c.renewal_at, DateTime))
+            .execution_options(synchronize_session=False)
+        )
+
+    def plan(self, user_id: UUID, day: date, now: datetime) -> datetime:
+        if day not in self.loads:
+            self.loads[day] = self.get_load(day)
+        buckets = get_buckets(day, now if day == now.date() else None) or [now]
+        bucket = pick_bucket(user_id, buckets, self.loads[day])
+        self.loads[day][bucket] += 1
+        return bucket
+
+    def get_load(self, day: date) -> Counter:
+        start = datetime.combine(day, time.min)
+        query = (
+            select(SubscriptionModel.renewal_at, func.count())
+            .where(
+                SubscriptionModel.renewal_at >= start,
+                SubscriptionModel.renewal_at < start + timedelta(days=1),
+                SubscriptionModel.status == str(SubscriptionStatus.ACTIVE)
+            )
+            .group_by(SubscriptionModel.renewal_at)
+        )
+        return Counter(dict(self.session.execute(query).all()))
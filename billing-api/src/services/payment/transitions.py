@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from models.payment import PaymentModel, PaymentStatus
+from models.subscription import SubscriptionModel, SubscriptionStatus
+from models.tariff import TariffModel
+from services.outbox import enqueue_subscription_change
+from services.payment.backoff import stop_checks
+
+
+def apply_payment_status(session: Session, payment: PaymentModel, status: str) -> SubscriptionModel | None:
+    """Переводит платеж в новый статус и активирует подписку, если платеж прошел.
+
+    Работает с синхронной сессией, из асинхронного кода вызывается через AsyncSession.run_sync.
+    Коммит остается на вызывающей стороне.
+    """
+    payment.status = status
+    stop_checks(payment)
+    session.add(payment)
+    if status != str(PaymentStatus.SUCCEEDED):
+        return None
+    return activate_subscription(session, payment)
+
+
+def activate_subscription(session: Session, payment: PaymentModel) -> SubscriptionModel:
+    tariff = session.get(TariffModel, payment.tariff_id)
+    query = session.execute(
+        select(SubscriptionModel).
+        where(SubscriptionModel.user_id == payment.user_id)
+    )
+    subscription = query.scalars().first()
+    # проверяем была ли подписка до этого
+    if not subscription:
+        subscription = SubscriptionModel(
+            user_id=payment.user_id,
+            tariff_id=payment.tariff_id,
+            start_date=datetime.now(),
+            end_date=datetime.now() + timedelta(days=tariff.duration),
+            status=repr(SubscriptionStatus.ACTIVE),
+            payment_id=payment.id
+        )
+        session.add(subscription)
+    else:
+        subscription.tariff_id = payment.tariff_id
+        subscription.start_date = datetime.now()
+        subscription.end_date = datetime.now() + timedelta(days=tariff.duration)
+        subscription.status = repr(SubscriptionStatus.ACTIVE)
+        subscription.payment_id = payment.id
+        subscription.renewal_at = None
+    # auth узнает об активации из outbox, запись коммитится вместе с подпиской
+    enqueue_subscription_change(session, payment.user_id, payment.tariff_id)
+    session.flush()
+    return subscription
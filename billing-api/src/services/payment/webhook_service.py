@@ -0,0 +1,89 @@
+import ipaddress
+import logging
+
+from fastapi import Depends
+from redis.asyncio import Redis
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from db.postgres import get_async_session
+from db.redis_db import get_redis
+from models.payment import PaymentModel, PaymentStatus
+from schemas.webhook import YookassaNotificationSchema
+from services.entitlement import EntitlementService
+from services.payment.transitions import apply_payment_status
+
+
+class WebhookService:
+
+    EVENT_KEY_PREFIX = 'billing:webhook:event:'
+    PAYMENT_EVENT_PREFIX = 'payment.'
+
+    def __init__(self, session: AsyncSession, redis: Redis):
+        self.session = session
+        self.redis = redis
+
+    @staticmethod
+    def is_allowed_source(host: str | None) -> bool:
+        if not settings.yookassa_webhook_ips:
+            return True
+        if not host:
+            return False
+        try:
+            address = ipaddress.ip_address(host)
+        except ValueError:
+            return False
+        return any(
+            address in ipaddress.ip_network(network, strict=False)
+            for network in settings.yookassa_webhook_ips
+        )
+
+    async def handle(self, notification: YookassaNotificationSchema) -> None:
+        if not notification.event.startswith(self.PAYMENT_EVENT_PREFIX):
+            return
+        if not await self.mark_delivered(notification.event_id):
+            logging.info(f'Duplicate notification {notification.event_id} skipped')
+            return
+        try:
+            await self.apply_notification(notification)
+        except Exception:
+            # даем Юkassa доставить уведомление повторно
+            await self.redis.delete(self.EVENT_KEY_PREFIX + notification.event_id)
+            raise
+
+    async def mark_delivered(self, event_id: str) -> bool:
+        return bool(await self.redis.set(
+            self.EVENT_KEY_PREFIX + event_id, 1, ex=settings.webhook_event_ttl, nx=True
+        ))
+
+    async def apply_notification(self, notification: YookassaNotificationSchema) -> None:
+        # переход из pending в pending ничего не меняет, а проверки платежа остановил бы
+        if notification.object.status == str(PaymentStatus.PENDING):
+            return
+        # блокировка строки: запасная проверка берет те же платежи с SKIP LOCKED,
+        # и статус не должен смениться между проверкой и записью
+        query = await self.session.execute(
+            select(PaymentModel)
+            .where(PaymentModel.payment_id == notification.object.id)
+            .with_for_update()
+        )
+        payment = query.scalars().first()
+        if not payment:
+            logging.warning(f'Notification for unknown payment {notification.object.id}')
+            return
+        # уже обработан запасной проверкой или предыдущим уведомлением
+        if payment.status != str(PaymentStatus.PENDING):
+            return
+
+        subscription = await self.session.run_sync(apply_payment_status, payment, notification.object.status)
+        await self.session.commit()
+        if subscription:
+            await EntitlementService(self.session, self.redis).store([subscription])
+
+
+def get_webhook_service(
+        session: AsyncSession = Depends(get_async_session),
+        redis: Redis = Depends(get_redis)
+) -> WebhookService:
+    return WebhookService(session, redis)
@@ -0,0 +1,66 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from yookassa import Configuration, Payment, Refund
+from yookassa.domain.response import PaymentResponse
+from yookassa.refund import RefundResponse
+
+from core.config import settings
+from db.redis_db import get_sync_redis
+from services.rate_limiter import TokenBucket, get_yookassa_rate_limiter
+
+
+# SDK Юkassa синхронный; его вызовы выполняются в отдельном ограниченном пуле
+# потоков, чтобы ожидание ответа провайдера не останавливало event loop
+executor: ThreadPoolExecutor | None = None
+# общий с продлениями и сверкой лимит запросов к Юkassa
+rate_limiter: TokenBucket | None = None
+
+
+def configure() -> None:
+    """Настраивает SDK один раз на процесс: в lifespan и при старте celery-воркера."""
+    Configuration.configure(
+        account_id=settings.yookassa_shopid,
+        secret_key=settings.yookassa_token
+    )
+    if settings.yookassa_api_url:
+        # например, локальный симулятор для нагрузочных тестов
+        Configuration.api_url = settings.yookassa_api_url
+
+
+def init_executor() -> None:
+    global executor, rate_limiter
+    executor = ThreadPoolExecutor(
+        max_workers=settings.yookassa_client_concurrency,
+        thread_name_prefix='yookassa'
+    )
+    rate_limiter = get_yookassa_rate_limiter(get_sync_redis())
+
+
+def shutdown_executor() -> None:
+    global executor, rate_limiter
+    if executor is not None:
+        executor.shutdown(wait=True)
+    executor = None
+    rate_limiter = None
+
+
+def call_limited(func, *args, **kwargs):
+    # ожидание токена занимает поток пула, а не event loop
+    if rate_limiter is not None:
+        rate_limiter.acquire()
+    return func(*args, **kwargs)
+
+
+async def run(func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, partial(call_limited, func, *args, **kwargs))
+
+
+async def create_payment(payload: dict, idempotency_key: str | None = None) -> PaymentResponse:
+    return await run(Payment.create, payload, idempotency_key)
+
+
+async def create_refund(payload: dict, idempotency_key: str | None = None) -> RefundResponse:
+    return await run(Refund.create, payload, idempotency_key)
@@ -1,22 +1,30 @@
-from uuid import UUID
+from uuid import UUID, uuid4
 
 from fastapi import Depends
+from redis.asyncio import Redis
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from yookassa import Configuration, Payment, Refund
+from yookassa import Payment
 from yookassa.refund import RefundResponse
 
 from core.config import settings
-from core.exceptions import AlreadySubscribedError, TariffNotFoundError, RefundError, SubscriptionNotFoundError
+from core.exceptions import (
+    AlreadySubscribedError, TariffNotFoundError, RefundError, SubscriptionNotFoundError, CheckoutInProgressError
+)
 from db.postgres import get_async_session
+from db.redis_db import get_redis
 from models.payment import PaymentModel, PaymentStatus
 from models.subscription import SubscriptionModel, SubscriptionStatus
 from models.refund import RefundModel
 from models.tariff import TariffModel
-from schemas.tariff import PaymentSchema, SubscriptionSchema
+from schemas.tariff import SubscriptionSchema
 from schemas.payment import CreatedPaymentSchema
-from services.auth_service import auth_async_unsubscribe
-from tasks import subscribe
+from services.entitlement import EntitlementService
+from services.leader import RELEASE_SCRIPT
+from services.outbox import enqueue_subscription_change
+from services.payment import yookassa_client
+from services.payment.backoff import schedule_check
+from services.tariff_cache import tariff_cache
 
 
 class PaymentWebhookError(Exception):
@@ -26,27 +34,35 @@ class PaymentWebhookError(Exception):
 class YookassaService:
 
     SUCCEEDED = 'succeeded'
+    CHECKOUT_LOCK_KEY = 'billing:checkout:{user_id}'
 
-    def __init__(self, session: AsyncSession):
-        Configuration.configure(
-            account_id=settings.yookassa_shopid,
-            secret_key=settings.yookassa_token
-        )
+    def __init__(self, session: AsyncSession, redis: Redis):
         self.session = session
-
-    async def create_payment(self, user_id: UUID, tariff_id: UUID) -> str:
-
-        if await self.is_subscribed(user_id):
-            raise AlreadySubscribedError
-
-        tariff = await self.session.get(TariffModel, tariff_id)
-        if not tariff:
-            raise TariffNotFoundError
-
-        payment_payload = self.create_payment_payload(tariff)
-        payment = Payment.create(payment_payload)
-        payment_db = await self.save_payment(user_id, tariff, payment)
-        subscribe.delay(payment_db.id, payment.id, payment.status)
+        self.redis = redis
+
+    async def create_payment(
+            self, user_id: UUID, tariff_id: UUID, idempotency_key: str | None = None
+    ) -> CreatedPaymentSchema:
+        # проверка подписки и создание платежа должны идти одним шагом для пользователя
+        lock_key = self.CHECKOUT_LOCK_KEY.format(user_id=user_id)
+        lock_token = uuid4().hex
+        if not await self.redis.set(lock_key, lock_token, nx=True, ex=settings.idempotency_lock_ttl_in_seconds):
+            raise CheckoutInProgressError
+        try:
+            if await self.is_subscribed(user_id):
+                raise AlreadySubscribedError
+
+            tariff = await tariff_cache.get(tariff_id)
+            if not tariff:
+                raise TariffNotFoundError
+
+            payment_payload = self.create_payment_payload(tariff)
+            payment = await yookassa_client.create_payment(payment_payload, idempotency_key)
+            # статус придет вебхуком, периодическая сверка страхует от потерянного уведомления
+            await self.save_payment(user_id, tariff, payment)
+        finally:
+            # блокировка могла истечь и достаться другому запросу, удаляем только свою
+            await self.redis.register_script(RELEASE_SCRIPT)(keys=[lock_key], args=[lock_token])
 
         return CreatedPaymentSchema(redirect_url=payment.confirmation.confirmation_url)
 
@@ -78,27 +94,29 @@ class YookassaService:
             payment_method_id=payment.payment_method.id,
             payment_id=payment.id
         )
+        schedule_check(new_payment, 0, settings.payment_fallback_check_delay)
         self.session.add(new_payment)
         await self.session.commit()
         return new_payment
 
-    async def unsubscribe(self, user_id: UUID, return_funds: bool) -> None:
+    async def unsubscribe(self, user_id: UUID, return_funds: bool, idempotency_key: str | None = None) -> None:
         subscription = await self.get_user_subscription(user_id)
 
         if return_funds:
-            tariff = await self.session.get(TariffModel, subscription.tariff_id)
+            tariff = await tariff_cache.get(subscription.tariff_id)
             payment_db = await self.session.get(PaymentModel, subscription.payment_id)
             payload = self.get_refund_payload(payment_db.payment_id, tariff.price, tariff.currency)
 
-            refund = Refund.create(payload)
+            refund = await yookassa_client.create_refund(payload, idempotency_key)
             await self.save_refund(refund)
 
             if refund.status != self.SUCCEEDED:
                 raise RefundError
 
         subscription.status = str(SubscriptionStatus.CANCELED)
+        enqueue_subscription_change(self.session, user_id, None)
         await self.session.commit()
-        await auth_async_unsubscribe(user_id=user_id)
+        await EntitlementService(self.session, self.redis).store([subscription])
 
 
     async def save_refund(self, refund: RefundResponse) -> None:
@@ -145,22 +163,6 @@ class YookassaService:
             return True
         return False
 
-    async def get_all_payments(self, user_id) -> list[PaymentSchema]:
-        query = await self.session.execute(select(PaymentModel).where(
-            PaymentModel.user_id == user_id
-        ))
-        payments = []
-        for payment in query.scalars().all():
-            payments.append(
-                PaymentSchema(
-                    id=payment.id,
-                    user_id=payment.user_id,
-                    tariff_id=payment.tariff_id,
-                    status=payment.status
-                )
-            )
-        return payments
-
     async def get_all_subscriptions(self, user_id) -> list[SubscriptionSchema]:
         query = await self.session.execute(select(SubscriptionModel).where(
             SubscriptionModel.user_id == user_id, SubscriptionModel.status == str(SubscriptionStatus.ACTIVE)))
@@ -181,6 +183,7 @@ class YookassaService:
 
 
 def get_yookassa_service(
-        session: AsyncSession = Depends(get_async_session)
+        session: AsyncSession = Depends(get_async_session),
+        redis: Redis = Depends(get_redis)
 ):
-    return YookassaService(session)
+    return YookassaService(session, redis)
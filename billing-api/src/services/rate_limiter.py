@@ -0,0 +1,52 @@
+import time
+
+from redis import Redis
+
+from core.config import settings
+
+
+# токены пополняются по часам Redis, поэтому ведро корректно делится между узлами
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + (now - ts) * rate / 1000)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = math.ceil((1 - tokens) * 1000 / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity * 1000 / rate) + 1000)
+return wait
+"""
+
+
+class TokenBucket:
+    """Общий для всех воркеров лимит запросов, хранится в Redis."""
+
+    def __init__(self, redis: Redis, name: str, rate: float, capacity: int):
+        self.key = f'billing:rate_limit:{name}'
+        self.rate = rate
+        self.capacity = capacity
+        self.script = redis.register_script(TOKEN_BUCKET_SCRIPT)
+
+    def acquire(self) -> int:
+        """Ждет свободный токен и возвращает, сколько раз пришлось ждать."""
+        throttled = 0
+        while wait_ms := self.script(keys=[self.key], args=[self.rate, self.capacity]):
+            throttled += 1
+            time.sleep(wait_ms / 1000)
+        return throttled
+
+
+def get_yookassa_rate_limiter(redis: Redis) -> TokenBucket:
+    """Лимит запросов к Юkassa: общий для продлений, сверки и платежей пользователей."""
+    return TokenBucket(
+        redis, 'yookassa', settings.yookassa_rate_limit_per_second, settings.yookassa_rate_limit_burst
+    )
@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta, date, time
+
+from fastapi import Depends
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from db.postgres import get_async_session
+from models.subscription import SubscriptionModel, SubscriptionStatus
+from schemas.renewal import RenewalBucketSchema
+from services.payment.renewal_planner import get_buckets
+
+
+class RenewalPlanService:
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_plan(self, day: date) -> list[RenewalBucketSchema]:
+        start = datetime.combine(day, time.min)
+        query = await self.session.execute(
+            select(SubscriptionModel.renewal_at, func.count())
+            .where(
+                SubscriptionModel.renewal_at >= start,
+                SubscriptionModel.renewal_at < start + timedelta(days=1),
+                SubscriptionModel.status == str(SubscriptionStatus.ACTIVE)
+            )
+            .group_by(SubscriptionModel.renewal_at)
+        )
+        load = dict(query.all())
+        # окна вне текущей сетки (например, после смены настроек) тоже показываем
+        buckets = sorted(set(get_buckets(day)) | set(load))
+        return [
+            RenewalBucketSchema(
+                start=bucket,
+                planned=load.get(bucket, 0),
+                capacity=settings.renewal_bucket_capacity
+            )
+            for bucket in buckets
+        ]
+
+
+def get_renewal_plan_service(
+        session: AsyncSession = Depends(get_async_session)
+):
+    return RenewalPlanService(session)
@@ -0,0 +1,81 @@
+import asyncio
+import logging
+import time
+from uuid import UUID
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy import select
+
+from core.config import settings
+from db import postgres
+from models.tariff import TariffModel
+
+
+class TariffCache:
+    """Каталог тарифов в памяти процесса.
+
+    Тарифы меняются только через админку, поэтому каталог целиком загружается
+    одним запросом и живет tariff_cache_ttl_in_seconds. Админка публикует событие
+    об изменении тарифа, по которому кеш сбрасывается раньше срока.
+    """
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self.tariffs: dict[UUID, TariffModel] = {}
+        self.loaded_at: float | None = None
+        # растет с каждой перезагрузкой, по нему сбрасываются производные от каталога
+        self.version = 0
+        self.lock = asyncio.Lock()
+
+    @property
+    def is_fresh(self) -> bool:
+        return self.loaded_at is not None and time.monotonic() - self.loaded_at < self.ttl
+
+    def invalidate(self) -> None:
+        self.loaded_at = None
+
+    async def get_all(self) -> dict[UUID, TariffModel]:
+        if self.is_fresh:
+            return self.tariffs
+        # один запрос на перезагрузку, остальные корутины ждут его результат
+        async with self.lock:
+            if not self.is_fresh:
+                await self.reload()
+        return self.tariffs
+
+    async def reload(self) -> None:
+        started = time.monotonic()
+        async with postgres.async_session_factory() as session:
+            query = await session.execute(select(TariffModel))
+            tariffs = {tariff.id: tariff for tariff in query.scalars().all()}
+        # объекты отсоединены от сессии, но все колонки уже загружены
+        self.tariffs = tariffs
+        self.version += 1
+        self.loaded_at = started
+
+    async def get(self, tariff_id: UUID) -> TariffModel | None:
+        return (await self.get_all()).get(tariff_id)
+
+    async def get_active(self) -> list[TariffModel]:
+        return [tariff for tariff in (await self.get_all()).values() if tariff.is_active]
+
+
+tariff_cache = TariffCache(settings.tariff_cache_ttl_in_seconds)
+
+
+async def listen_tariff_changes(redis: Redis) -> None:
+    """Сбрасывает кеш тарифов по событиям админки, запускается в lifespan."""
+    while True:
+        try:
+            async with redis.pubsub() as pubsub:
+                await pubsub.subscribe(settings.tariff_changes_channel)
+                # события, пропущенные за время переподключения, теряются
+                tariff_cache.invalidate()
+                async for message in pubsub.listen():
+                    if message['type'] == 'message':
+                        tariff_cache.invalidate()
+        except RedisError:
+            logging.exception('Tariff changes subscription failed, reconnecting')
+            tariff_cache.invalidate()
+            await asyncio.sleep(settings.tariff_changes_reconnect_delay)
@@ -1,21 +1,37 @@
-from fastapi import Depends
-from sqlalchemy import select
-from sqlmodel.ext.asyncio.session import AsyncSession
+import hashlib
+from dataclasses import dataclass
+
+import orjson
 
-from db.postgres import get_async_session
-from models.tariff import TariffModel
 from schemas.tariff import TariffSchema
+from services.tariff_cache import TariffCache, tariff_cache
+
+
+@dataclass(frozen=True)
+class TariffCatalog:
+    version: int
+    body: bytes
+    etag: str
+
+    def matches(self, if_none_match: str | None) -> bool:
+        if not if_none_match:
+            return False
+        tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+        return '*' in tags or self.etag in tags
+
+
+# готовый ответ для текущей версии каталога, общий для всех запросов процесса
+rendered_catalog: TariffCatalog | None = None
 
 
 class TariffService:
 
-    def __init__(self, session):
-        self.session = session
+    def __init__(self, cache: TariffCache):
+        self.cache = cache
 
     async def get_active_tariffs(self) -> list[TariffSchema]:
-        query = await self.session.execute(select(TariffModel).where(TariffModel.is_active == True))
         tariffs = []
-        for tariff in query.scalars().all():
+        for tariff in await self.cache.get_active():
             tariffs.append(
                 TariffSchema(
                     id=tariff.id,
@@ -26,8 +42,21 @@ class TariffService:
             )
         return tariffs
 
+    async def get_catalog(self) -> TariffCatalog:
+        """Сериализованный каталог активных тарифов и его ETag."""
+        global rendered_catalog
+        # проверяет TTL и при необходимости перезагружает каталог
+        await self.cache.get_all()
+        if rendered_catalog is None or rendered_catalog.version != self.cache.version:
+            tariffs = await self.get_active_tariffs()
+            body = orjson.dumps([tariff.model_dump(mode='json') for tariff in tariffs])
+            rendered_catalog = TariffCatalog(
+                version=self.cache.version,
+                body=body,
+                etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+            )
+        return rendered_catalog
+
 
-def get_tariff_service(
-        session: AsyncSession = Depends(get_async_session)
-):
-    return TariffService(session)
+def get_tariff_service():
+    return TariffService(tariff_cache)
@@ -1,113 +1,142 @@
-import time
 import logging
-from datetime import datetime, timedelta, date
+from concurrent.futures import ThreadPoolExecutor
 
 from celery import Celery
-from sqlalchemy import select, cast, Date
-from yookassa import Payment, Configuration
+from celery.signals import worker_process_init, worker_process_shutdown
 
-from models.payment import PaymentModel, PaymentStatus
-from models.subscription import SubscriptionModel, SubscriptionStatus
-from models.tariff import TariffModel
+from db import postgres, redis_db
+from services import auth_service
 from db.postgres import get_sync_session
+from db.redis_db import get_sync_redis
 from core.config import settings
-from services.auth_service import auth_subscribe, auth_unsubscribe
+from services.entitlement import EntitlementCache
+from services.outbox import OutboxDispatcher
+from services.payment.reconciler import PaymentReconciler
+from services.payment import yookassa_client
+from services.payment.charge_executor import ChargeExecutor
+from services.payment.renewal import RenewalEngine
+from services.payment.renewal_planner import RenewalPlanner
+from services.rate_limiter import get_yookassa_rate_limiter
+from services.leader import LeaderLease
+
+AUTO_PAY_LEASE = 'auto_pay'
+OUTBOX_LEASE = 'subscription_outbox'
 
 celery = Celery(__name__)
 celery.conf.broker_url = settings.celery.broker_url
 celery.conf.result_backend = settings.celery.broker_url
+# задачи подтверждаются после выполнения и возвращаются в очередь, если воркер упал
+celery.conf.task_acks_late = True
+celery.conf.task_reject_on_worker_lost = True
+celery.conf.beat_schedule = {
+    'reconcile-pending-payments': {
+        'task': 'Reconcile pending payments',
+        'schedule': settings.reconcile_interval_in_seconds,
+    },
+    'auto-pay': {
+        'task': 'Auto pay or subscribe cancellation',
+        'schedule': settings.auto_pay_delay,
+    },
+    'plan-renewals': {
+        'task': 'Plan subscription renewals',
+        'schedule': settings.renewal_plan_interval_in_seconds,
+    },
+    'dispatch-subscription-outbox': {
+        'task': 'Dispatch subscription changes to auth',
+        'schedule': settings.outbox_dispatch_interval_in_seconds,
+    },
+}
+
+
+@worker_process_init.connect
+def init_worker_process(**kwargs):
+    # соединения нельзя наследовать от родительского процесса через fork
+    postgres.init_sync_engine()
+    redis_db.sync_redis = None
+    auth_service.sync_session = None
+    yookassa_client.configure()
+
 
+@worker_process_shutdown.connect
+def shutdown_worker_process(**kwargs):
+    postgres.dispose_sync_engine()
+    if auth_service.sync_session is not None:
+        auth_service.sync_session.close()
 
-@celery.task(name="Check payment status & subscribe")
-def subscribe(payment_model_id, payment_id, payment_status):
-    Configuration.configure(
-        account_id=settings.yookassa_shopid,
-        secret_key=settings.yookassa_token
+
+@celery.task(name="Reconcile pending payments")
+def reconcile_pending_payments():
+    """Запасная сверка статусов платежей, уведомления о которых от Юkassa не пришли."""
+    with get_sync_session() as session, ThreadPoolExecutor(max_workers=settings.reconcile_concurrency) as executor:
+        report = PaymentReconciler(
+            session, executor, EntitlementCache(get_sync_redis()), get_yookassa_rate_limiter(get_sync_redis())
+        ).run()
+    return (
+        f"Checked {report.checked} pending payments in {report.batches} batches, "
+        f"{report.changed} changed, {report.activated} subscriptions activated."
     )
-    tries = 1
-    delay_in_seconds = settings.check_delay_in_seconds
-    while True:
-        time.sleep(delay_in_seconds)
-        logging.info(f'Try #{tries}')
-        new_payment_data = Payment.find_one(str(payment_id))
-        if new_payment_data.status != payment_status:
-            session = get_sync_session()
-            payment = session.get(PaymentModel, payment_model_id)
-            payment.status = new_payment_data.status
-            session.add(payment)
-            response_text = f"Payment {payment.payment_id} changed the status. "
-            if new_payment_data.status == repr(PaymentStatus.SUCCEEDED):
-                tariff = session.get(TariffModel, payment.tariff_id)
-                query = session.execute(
-                    select(SubscriptionModel).
-                    where(SubscriptionModel.user_id == payment.user_id)
-                )
-                subscription = query.scalars().first()
-                # проверяем была ли подписка до этого
-                if not subscription:
-                    subscription = SubscriptionModel(
-                        user_id=payment.user_id,
-                        tariff_id=payment.tariff_id,
-                        start_date=datetime.now(),
-                        end_date=datetime.now() + timedelta(days=tariff.duration),
-                        status=repr(SubscriptionStatus.ACTIVE),
-                        payment_id=payment.id
-                    )
-                    session.add(subscription)
-                else:
-                    subscription.tariff_id = payment.tariff_id
-                    subscription.start_date = datetime.now()
-                    subscription.end_date = datetime.now() + timedelta(days=tariff.duration)
-                    subscription.status = repr(SubscriptionStatus.ACTIVE)
-                    subscription.payment_id = payment.id
-
-                response_text += f"New subscribe {subscription.id} for user {payment.user_id}."
-            session.commit()
-            auth_subscribe(payment.user_id, payment.tariff_id)
-            return response_text
-        tries += 1
-        delay_in_seconds += delay_in_seconds
+
+
+@celery.task(name="Dispatch subscription changes to auth")
+def dispatch_subscription_outbox():
+    """Доставляет в auth изменения подписок, накопленные в outbox."""
+    lease = LeaderLease(get_sync_redis(), OUTBOX_LEASE, settings.leader_lease_ttl_in_seconds)
+    if not lease.acquire():
+        return "Outbox is already being dispatched on another node."
+
+    result = None
+    try:
+        with get_sync_session() as session:
+            report = OutboxDispatcher(session).run()
+        result = (
+            f"Delivered {report.delivered} subscription changes in {report.batches} batches, "
+            f"{report.coalesced} coalesced, {report.failed} postponed, max lag {report.max_lag:.1f}s."
+        )
+        if report.batches:
+            logging.info(result)
+        return result
+    finally:
+        lease.release(result)
+
+
+@celery.task(name="Plan subscription renewals")
+def plan_renewals():
+    with get_sync_session() as session:
+        loads = RenewalPlanner(session).run()
+    for day, load in sorted(loads.items()):
+        logging.info(f"Renewal plan for {day}: " + ", ".join(
+            f"{bucket:%H:%M}={planned}" for bucket, planned in sorted(load.items())
+        ))
+    return f"Planned renewals for {len(loads)} days."
 
 
 @celery.task(name="Auto pay or subscribe cancellation")
 def auto_pay():
-    Configuration.configure(
-        account_id=settings.yookassa_shopid,
-        secret_key=settings.yookassa_token
-    )
-    while True:
+    """Один проход продления подписок, запускается celery beat.
+
+    Аренда лидерства не дает пересечься проходам, если предыдущий затянулся
+    дольше интервала или beat оказался запущен дважды.
+    """
+    lease = LeaderLease(get_sync_redis(), AUTO_PAY_LEASE, settings.leader_lease_ttl_in_seconds)
+    if not lease.acquire():
+        return "Renewal is already running on another node."
+
+    result = None
+    try:
         logging.info("Run checking subscriptions")
-        session = get_sync_session()
-        subscriptions = session.query(SubscriptionModel).filter(cast(SubscriptionModel.end_date, Date) == date.today(), SubscriptionModel.status == str(SubscriptionStatus.ACTIVE)).all()
-        for subscription in subscriptions:
-            tariff = session.get(TariffModel, subscription.tariff_id)
-            old_payment_db = session.get(PaymentModel, subscription.payment_id)
-            payment = Payment.create(
-                {
-                    "amount": {
-                        "value": tariff.price,
-                        "currency": tariff.currency
-                    },
-                    "capture": True,
-                    "payment_method_id": old_payment_db.payment_method_id,
-                    "description": tariff.description
-                }
-            )
-            new_payment = PaymentModel(
-                user_id=subscription.user_id,
-                tariff_id=tariff.id,
-                status=payment.status,
-                payment_method_id=payment.payment_method.id,
-                payment_id=payment.id
-            )
-            session.add(new_payment)
-            session.commit()
-
-            subscription.payment_id = new_payment.id
-            if payment.status == 'succeeded':
-                subscription.end_date = datetime.now() + timedelta(days=tariff.duration)
-            else:
-                subscription.status = str(SubscriptionStatus.CANCELED)
-                auth_unsubscribe(subscription.user_id)
-            session.commit()
-        time.sleep(settings.auto_pay_delay)
+        rate_limiter = get_yookassa_rate_limiter(get_sync_redis())
+        with get_sync_session() as session, \
+                ThreadPoolExecutor(max_workers=settings.renewal_charge_concurrency) as executor:
+            charge_executor = ChargeExecutor(executor, rate_limiter)
+            report = RenewalEngine(
+                session, charge_executor, EntitlementCache(get_sync_redis())
+            ).run(is_active=lambda: lease.is_held)
+        result = (
+            f"Renewed {report.renewed} subscriptions in {report.batches} batches, "
+            f"{len(report.failed)} failed, {len(report.canceled_users)} canceled. "
+            f"{charge_executor.stats.summary()}"
+        )
+        logging.info(result)
+        return result
+    finally:
+        lease.release(result)
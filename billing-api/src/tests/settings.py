@@ -5,6 +5,10 @@ class BillingClientSettings(BaseSettings):
     base_url: str = "http://nginx:81/billing-api/v1"
     subscribe_path: str = "/subscribe"
     tariff_path: str = "/tariffs"
+    webhook_path: str = "/webhook/yookassa"
+    history_path: str = "/history"
+    entitlements_path: str = "/entitlements"
+    service_api_key: str = "11111"
 
     model_config = SettingsConfigDict(env_prefix="billing_client_", env_file=".env")
 
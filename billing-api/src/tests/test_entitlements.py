@@ -0,0 +1,37 @@
+from http import HTTPStatus
+from uuid import uuid4
+
+import pytest
+
+from app.tests.settings import billing_client_settings as settings
+
+
+pytestmark = pytest.mark.asyncio
+
+SERVICE_HEADERS = {'x-api-key': settings.service_api_key}
+
+
+async def test_entitlement_invalid_key(billing_client):
+    response = await billing_client.get(f'{settings.entitlements_path}/{uuid4()}', headers={'x-api-key': 'invalid'})
+    assert response.status_code == HTTPStatus.FORBIDDEN
+
+
+async def test_entitlement_unknown_user(billing_client):
+    user_id = str(uuid4())
+    response = await billing_client.get(f'{settings.entitlements_path}/{user_id}', headers=SERVICE_HEADERS)
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {'user_id': user_id, 'active': False, 'tariff_id': None, 'end_date': None}
+
+
+async def test_entitlements_batch(billing_client):
+    user_ids = [str(uuid4()) for _ in range(3)]
+    response = await billing_client.post(
+        settings.entitlements_path, json={'user_ids': user_ids + user_ids[:1]}, headers=SERVICE_HEADERS
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert [entitlement['user_id'] for entitlement in response.json()] == user_ids
+
+
+async def test_entitlements_batch_empty(billing_client):
+    response = await billing_client.post(settings.entitlements_path, json={'user_ids': []}, headers=SERVICE_HEADERS)
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
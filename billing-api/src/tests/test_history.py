@@ -0,0 +1,32 @@
+from http import HTTPStatus
+
+import pytest
+
+from app.tests.settings import billing_client_settings as settings
+
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_history_page(auth_client, billing_client):
+    auth_headers = await auth_client.get_auth_headers()
+    response = await billing_client.get(settings.history_path, params={'limit': 1}, headers=auth_headers)
+    assert response.status_code == HTTPStatus.OK
+    assert len(response.json()) <= 1
+
+
+async def test_history_invalid_cursor(auth_client, billing_client):
+    auth_headers = await auth_client.get_auth_headers()
+    response = await billing_client.get(
+        settings.history_path, params={'cursor': 'invalid'}, headers=auth_headers
+    )
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+async def test_history_stream(auth_client, billing_client):
+    auth_headers = await auth_client.get_auth_headers()
+    response = await billing_client.get(
+        settings.history_path, headers={**auth_headers, 'Accept': 'application/x-ndjson'}
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'].startswith('application/x-ndjson')
@@ -0,0 +1,70 @@
+from types import SimpleNamespace
+
+from app.services import jwt_service
+from app.services.jwt_service import ClaimsCache
+from app.schemas.user import UserSchema
+
+
+NOW = 1_700_000_000.0
+
+
+def get_user(user_id: str) -> UserSchema:
+    return UserSchema(user_id=user_id, roles=[], subscription='')
+
+
+def set_time(monkeypatch, value: float) -> None:
+    # подменяем часы только в модуле кеша, а не глобальный time.time
+    monkeypatch.setattr(jwt_service, 'time', SimpleNamespace(time=lambda: value))
+
+
+def test_claims_cache_hit_before_exp(monkeypatch):
+    cache = ClaimsCache(size=10)
+    set_time(monkeypatch, NOW)
+    cache.put('token', get_user('1'), expires_at=NOW + 60)
+
+    set_time(monkeypatch, NOW + 59)
+    assert cache.get('token') == get_user('1')
+
+
+def test_claims_cache_expires_at_exp(monkeypatch):
+    cache = ClaimsCache(size=10)
+    set_time(monkeypatch, NOW)
+    cache.put('token', get_user('1'), expires_at=NOW + 60)
+
+    set_time(monkeypatch, NOW + 60)
+    assert cache.get('token') is None
+    assert not cache.entries
+
+
+def test_claims_cache_evicts_least_recently_used(monkeypatch):
+    cache = ClaimsCache(size=2)
+    set_time(monkeypatch, NOW)
+    cache.put('first', get_user('1'), expires_at=NOW + 60)
+    cache.put('second', get_user('2'), expires_at=NOW + 60)
+    # обращение делает first самым свежим, вытесняется second
+    assert cache.get('first')
+    cache.put('third', get_user('3'), expires_at=NOW + 60)
+
+    assert len(cache.entries) == 2
+    assert cache.get('second') is None
+    assert cache.get('first') == get_user('1')
+    assert cache.get('third') == get_user('3')
+
+
+def test_claims_cache_counts_hits_and_misses(monkeypatch):
+    cache = ClaimsCache(size=10)
+    set_time(monkeypatch, NOW)
+    assert cache.get('token') is None
+    cache.put('token', get_user('1'), expires_at=NOW + 60)
+    assert cache.get('token')
+    assert cache.get('token')
+
+    stats = cache.snapshot()
+    assert (stats.hits, stats.misses) == (2, 1)
+    assert stats.hit_ratio == 2 / 3
+    assert (stats.size, stats.max_size) == (1, 10)
+
+
+def test_claims_cache_empty_snapshot():
+    stats = ClaimsCache(size=10).snapshot()
+    assert (stats.hits, stats.misses, stats.hit_ratio) == (0, 0, 0.0)
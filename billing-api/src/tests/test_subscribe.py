@@ -28,3 +28,22 @@ async def test_subscribe_invalid_tariff(auth_client, billing_client):
         tariff_id=invalid_tariff_id, headers=auth_headers
     )
     assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+async def test_subscribe_idempotency_key_replay(auth_client, billing_client):
+    invalid_tariff_id = str(uuid4())
+    auth_headers = await auth_client.get_auth_headers()
+    headers = {**auth_headers, 'Idempotency-Key': str(uuid4())}
+    first = await billing_client.subscribe(tariff_id=invalid_tariff_id, headers=headers)
+    second = await billing_client.subscribe(tariff_id=invalid_tariff_id, headers=headers)
+    assert first.status_code == second.status_code == HTTPStatus.NOT_FOUND
+    assert second.headers['idempotent-replayed'] == 'true'
+    assert first.json() == second.json()
+
+
+async def test_subscribe_idempotency_key_reused(auth_client, billing_client):
+    auth_headers = await auth_client.get_auth_headers()
+    headers = {**auth_headers, 'Idempotency-Key': str(uuid4())}
+    await billing_client.subscribe(tariff_id=str(uuid4()), headers=headers)
+    response = await billing_client.subscribe(tariff_id=str(uuid4()), headers=headers)
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
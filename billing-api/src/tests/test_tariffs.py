@@ -0,0 +1,29 @@
+from http import HTTPStatus
+
+import pytest
+
+from app.tests.settings import billing_client_settings as settings
+
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_tariffs_etag(billing_client):
+    response = await billing_client.get(settings.tariff_path)
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['etag']
+    assert 'max-age' in response.headers['cache-control']
+
+
+async def test_tariffs_not_modified(billing_client):
+    response = await billing_client.get(settings.tariff_path)
+    response = await billing_client.get(
+        settings.tariff_path, headers={'If-None-Match': response.headers['etag']}
+    )
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert not response.content
+
+
+async def test_tariffs_stale_etag(billing_client):
+    response = await billing_client.get(settings.tariff_path, headers={'If-None-Match': '"stale"'})
+    assert response.status_code == HTTPStatus.OK
@@ -0,0 +1,24 @@
+from http import HTTPStatus
+from uuid import uuid4
+
+import pytest
+
+from app.tests.settings import billing_client_settings as settings
+
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_webhook_invalid_payload(billing_client):
+    response = await billing_client.post(settings.webhook_path, json={'event': 'payment.succeeded'})
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+async def test_webhook_not_allowed_source(billing_client):
+    notification = {
+        'type': 'notification',
+        'event': 'payment.succeeded',
+        'object': {'id': str(uuid4()), 'status': 'succeeded'}
+    }
+    response = await billing_client.post(settings.webhook_path, json=notification)
+    assert response.status_code == HTTPStatus.FORBIDDEN